@@ -0,0 +1,326 @@
+"""
+Benchmark the auth, approval and dashboard endpoints against a local Postgres.
+
+Seeds users and artist works (tagged with a per-run email prefix), drives each
+endpoint in-process through Django's test client, and reports throughput,
+p50/p95/p99 latency and SQL queries per request. Results are written as JSON
+so runs can be compared across commits.
+
+    DB_NAME=... DB_USER=... python benchmarks/bench_endpoints.py \\
+        --users 10000 --requests 500 --threads 4 --output bench_results.json
+
+The database must be migrated (python manage.py migrate). Seeded rows are
+removed at the end unless --keep is given.
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+# Every simulated client logs in from 127.0.0.1; don't let the login throttle cut them off
+os.environ.setdefault("LOGIN_THROTTLE_IP_LIMIT", "0")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.db import connection, connections  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from users.models import UserModel  # noqa: E402
+
+PASSWORD = "bench-password"
+API = "/api/users"
+
+
+class Seed:
+    """
+    Seeded accounts and ids shared by the scenarios.
+    """
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.pending_ids = []
+        self._pending_lock = threading.Lock()
+        self._signup_counter = 0
+
+    def email(self, label):
+        return f"{self.prefix}-{label}@bench.example.com"
+
+    def next_pending_id(self):
+        with self._pending_lock:
+            return self.pending_ids.pop() if self.pending_ids else None
+
+    def next_signup_email(self):
+        with self._pending_lock:
+            self._signup_counter += 1
+            return self.email(f"signup-{self._signup_counter}")
+
+
+def seed(prefix, users, works, batch_size=1000):
+    """
+    Inserts `users` users (mostly approved artists, some pending managers),
+    one account per role to log in with, and `works` works for the artist.
+    """
+    state = Seed(prefix)
+    password = make_password(PASSWORD)  # One hash for every seeded user keeps seeding fast
+
+    def user(label, role_type, is_approved):
+        return {
+            "first_name": "Bench", "last_name": label, "email": state.email(label), "password": password,
+            "phone": None, "dob": None, "gender": "o", "address": None,
+            "role_type": role_type, "is_approved": is_approved,
+        }
+
+    accounts = [
+        user("super-admin", "super_admin", True),
+        user("manager", "artist_manager", True),
+        user("artist", "artist", True),
+    ]
+    UserModel.bulk_create_users(accounts)
+
+    batch = []
+    for i in range(users):
+        # One in ten seeded users is a manager awaiting approval
+        if i % 10 == 0:
+            batch.append(user(f"pending-{i}", "artist_manager", False))
+        else:
+            batch.append(user(f"artist-{i}", "artist", True))
+        if len(batch) >= batch_size:
+            state.pending_ids.extend(
+                user_id for email, user_id in UserModel.bulk_create_users(batch).items() if "-pending-" in email
+            )
+            batch = []
+    if batch:
+        state.pending_ids.extend(
+            user_id for email, user_id in UserModel.bulk_create_users(batch).items() if "-pending-" in email
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT id FROM users WHERE email = %s;", [state.email("artist")])
+        artist_id = cursor.fetchone()[0]
+        cursor.execute("""
+            INSERT INTO artist_works (artist_id, title, created_at, updated_at)
+            SELECT %s, 'Work ' || g, CURRENT_TIMESTAMP - g * INTERVAL '1 minute', CURRENT_TIMESTAMP
+            FROM generate_series(1, %s) AS g;
+        """, [artist_id, works])
+
+    return state
+
+
+def cleanup(prefix):
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM users WHERE email LIKE %s;", [f"{prefix}-%"])
+    UserModel.bump_data_version()
+
+
+def login(client, seed_state, label):
+    response = client.post(
+        f"{API}/auth/login/",
+        {"email": seed_state.email(label), "password": PASSWORD},
+        content_type="application/json",
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"Login as {label} failed with {response.status_code}: {response.content[:200]}")
+    return response.json()
+
+
+def scenarios(seed_state):
+    """
+    Returns {name: factory}; a factory takes a Client and returns a
+    zero-argument callable that performs one request.
+    """
+    def signup(client):
+        def request():
+            return client.post(f"{API}/auth/signup/", {
+                "first_name": "Bench", "last_name": "Signup", "email": seed_state.next_signup_email(),
+                "password": PASSWORD, "confirm_password": PASSWORD, "gender": "o", "role_type": "artist",
+            }, content_type="application/json")
+        return request
+
+    def login_(client):
+        def request():
+            return client.post(f"{API}/auth/login/", {
+                "email": seed_state.email("artist"), "password": PASSWORD,
+            }, content_type="application/json")
+        return request
+
+    def refresh(client):
+        # Refresh tokens may rotate, so always send the latest one
+        token = {"refresh": login(client, seed_state, "artist")["refresh_token"]}
+
+        def request():
+            response = client.post(f"{API}/auth/refresh-token/", {
+                "refresh_token": token["refresh"],
+            }, content_type="application/json")
+            if response.status_code == 200:
+                token["refresh"] = response.json()["refresh_token"]
+            return response
+        return request
+
+    def authenticated_get(path, label):
+        def factory(client):
+            access = login(client, seed_state, label)["access_token"]
+
+            def request():
+                return client.get(path, HTTP_AUTHORIZATION=f"Bearer {access}")
+            return request
+        return factory
+
+    def approve(client):
+        access = login(client, seed_state, "super-admin")["access_token"]
+
+        def request():
+            return client.post(f"{API}/admin/approve-user/", {
+                "user_id": seed_state.next_pending_id() or 0,
+            }, content_type="application/json", HTTP_AUTHORIZATION=f"Bearer {access}")
+        return request
+
+    return {
+        "signup": signup,
+        "login": login_,
+        "refresh_token": refresh,
+        "pending_users": authenticated_get(f"{API}/admin/pending-users/", "super-admin"),
+        "approve_user": approve,
+        "super_admin_dashboard": authenticated_get(f"{API}/dashboard/super-admin/", "super-admin"),
+        "artist_manager_dashboard": authenticated_get(f"{API}/dashboard/artist-manager/", "manager"),
+        "artist_dashboard": authenticated_get(f"{API}/dashboard/artist/", "artist"),
+    }
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(factory, requests, threads, warmup):
+    """
+    Runs `requests` requests spread over `threads` threads, each with its own
+    client and DB connection. Returns latency, error and query statistics.
+    """
+    latencies = []
+    queries = []
+    errors = []
+    lock = threading.Lock()
+    per_thread = [requests // threads + (1 if i < requests % threads else 0) for i in range(threads)]
+    barrier = threading.Barrier(threads + 1, timeout=300)
+
+    def worker(count):
+        try:
+            client = Client(HTTP_HOST="localhost")
+            request = factory(client)
+            for _ in range(warmup):
+                request()
+        except Exception:
+            barrier.abort()  # Fail the whole scenario instead of hanging the others
+            raise
+        barrier.wait()
+
+        local_latencies, local_queries, local_errors = [], [], 0
+        for _ in range(count):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = request()
+                local_latencies.append((time.perf_counter() - started) * 1000)
+            local_queries.append(len(captured.captured_queries))
+            if response.status_code >= 400:
+                local_errors += 1
+
+        with lock:
+            latencies.extend(local_latencies)
+            queries.extend(local_queries)
+            errors.append(local_errors)
+        connections.close_all()
+
+    workers = [threading.Thread(target=worker, args=(count,)) for count in per_thread]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(latencies) if latencies else 0.0,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "queries_per_request": statistics.fmean(queries) if queries else 0.0,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the auth, approval and dashboard endpoints.")
+    parser.add_argument("--users", type=int, default=10000, help="Users to seed.")
+    parser.add_argument("--works", type=int, default=1000, help="Artist works to seed for the benchmark artist.")
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per scenario.")
+    parser.add_argument("--threads", type=int, default=1, help="Concurrent clients per scenario.")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per client before measuring.")
+    parser.add_argument("--scenario", action="append", help="Only run these scenarios (repeatable).")
+    parser.add_argument("--output", default="bench_results.json", help="JSON results file.")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded rows after the run.")
+    args = parser.parse_args()
+
+    prefix = f"bench-{uuid.uuid4().hex[:8]}"
+    print(f"Seeding {args.users} users and {args.works} works ({prefix})...", file=sys.stderr)
+    seed_state = seed(prefix, args.users, args.works)
+    # approve_user consumes one pending user per request
+    if len(seed_state.pending_ids) < args.requests + args.warmup * args.threads:
+        print("Warning: not enough pending users for every approve_user request; "
+              "raise --users for clean approval numbers.", file=sys.stderr)
+
+    results = {}
+    try:
+        for name, factory in scenarios(seed_state).items():
+            if args.scenario and name not in args.scenario:
+                continue
+            print(f"Running {name}...", file=sys.stderr)
+            results[name] = run_scenario(factory, args.requests, args.threads, args.warmup)
+    finally:
+        if not args.keep:
+            cleanup(prefix)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "parameters": {
+            "users": args.users, "works": args.works, "requests": args.requests,
+            "threads": args.threads, "warmup": args.warmup,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+
+    print(f"{'scenario':<26} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'errors':>7}")
+    for name, result in results.items():
+        print(f"{name:<26} {result['throughput_rps']:>9.1f} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+              f"{result['p99_ms']:>9.2f} {result['queries_per_request']:>8.2f} {result['errors']:>7}")
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
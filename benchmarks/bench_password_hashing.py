@@ -0,0 +1,96 @@
+"""
+Micro-benchmark: login password verification throughput per hasher, inline
+on request threads vs. on the hashing process pool (users/hashing.py).
+
+Runs without a database. For each hasher it reports verifications per second
+on one core, with `--threads` concurrent request threads hashing inline, and
+with the same threads submitting to a pool of `--workers` processes, plus
+the per-core figure (throughput divided by the cores in use).
+
+    python benchmarks/bench_password_hashing.py [--verifications 200] [--threads 8] [--workers 4]
+
+argon2 is included when argon2-cffi is installed; its costs come from the
+ARGON2_* settings (environment variables).
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.hashers import check_password, get_hasher, make_password  # noqa: E402
+
+from users.hashing import HashingPool  # noqa: E402
+
+PASSWORD = "bench-password"
+
+
+def available_hashers():
+    hashers = ["pbkdf2_sha256"]
+    try:
+        import argon2  # noqa: F401
+    except ImportError:
+        print("argon2-cffi not installed; skipping argon2.", file=sys.stderr)
+    else:
+        hashers.append("argon2")
+    return hashers
+
+
+def run_threads(verify, count, threads):
+    """
+    Runs `count` verifications spread over `threads` threads; returns verifications per second.
+    """
+    per_thread = [count // threads + (1 if i < count % threads else 0) for i in range(threads)]
+
+    def worker(n):
+        for _ in range(n):
+            assert verify()
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in per_thread]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark login password verification throughput.")
+    parser.add_argument("--verifications", type=int, default=200, help="Verifications per measurement.")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent request threads.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Hashing pool processes.")
+    args = parser.parse_args()
+
+    pool = HashingPool(workers=args.workers)
+    # Start the workers (and their django.setup()) before measuring
+    list(pool.map(len, ["warm"] * args.workers, chunksize=1))
+
+    cores = os.cpu_count() or 1
+    inline_cores = min(args.threads, cores)
+    pool_cores = min(args.workers, cores)
+
+    print(f"{'hasher':<16} {'mode':<18} {'verify/s':>10} {'per core':>10} {'ms each':>9}")
+    for algorithm in available_hashers():
+        encoded = make_password(PASSWORD, hasher=get_hasher(algorithm))
+        measurements = [
+            ("1 thread", 1, 1, lambda: check_password(PASSWORD, encoded)),
+            (f"inline x{args.threads}", args.threads, inline_cores, lambda: check_password(PASSWORD, encoded)),
+            (f"pool x{args.workers}", args.threads, pool_cores,
+             lambda: pool.submit(check_password, PASSWORD, encoded).result()),
+        ]
+        for mode, threads, used_cores, verify in measurements:
+            rate = run_threads(verify, args.verifications, threads)
+            print(f"{algorithm:<16} {mode:<18} {rate:>10.1f} {rate / used_cores:>10.1f} {1000 / rate * threads:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Micro-benchmark: dict(zip()) rows + setattr User vs. cached-layout records + slotted User.
+
+Runs without a database against synthetic rows shaped like the users table.
+
+    python benchmarks/bench_row_mapping.py [--rows 10000]
+"""
+import argparse
+import datetime
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import django  # noqa: E402
+
+django.setup()
+
+from users import rows  # noqa: E402
+from users.authentication import User  # noqa: E402
+
+PENDING_COLUMNS = ("id", "first_name", "last_name", "email", "role_type", "created_at")
+AUTH_COLUMNS = ("id", "email", "first_name", "last_name", "role_type", "is_approved", "token_version")
+
+
+class FakeCursor:
+    """
+    Just enough of a DB-API cursor for the row mappers.
+    """
+    def __init__(self, columns, data):
+        self.description = [(name, None, None, None, None, None, None) for name in columns]
+        self._data = data
+
+    def fetchall(self):
+        return self._data
+
+    def fetchone(self):
+        return self._data[0] if self._data else None
+
+
+class LegacyUser:
+    """
+    The User class as it was: every dict key copied on with setattr.
+    """
+    def __init__(self, **kwargs):
+        self.role_type = kwargs.get('role_type', None)
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+        self.is_authenticated = True
+        self.is_active = kwargs.get('is_approved', False)
+
+
+def legacy_fetchall(cursor):
+    columns = [col[0] for col in cursor.description]
+    data = cursor.fetchall()
+    return [dict(zip(columns, row)) for row in data] if data else []
+
+
+def legacy_auth(cursor):
+    row = cursor.fetchone()
+    columns = [col[0] for col in cursor.description]
+    return LegacyUser(**dict(zip(columns, row)))
+
+
+def record_auth(cursor):
+    return User.from_row(rows.fetchone(cursor))
+
+
+def peak_bytes(fn, *args):
+    tracemalloc.start()
+    result = fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000, help="Rows per list query.")
+    args = parser.parse_args()
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    pending = [(i, "First", "Last", f"user{i}@example.com", "artist_manager", now) for i in range(args.rows)]
+    auth = [(1, "user1@example.com", "First", "Last", "artist", True, 0)]
+    list_cursor = FakeCursor(PENDING_COLUMNS, pending)
+    auth_cursor = FakeCursor(AUTH_COLUMNS, auth)
+
+    results = []
+    for name, legacy, current, cursor, number in [
+        (f"list of {args.rows} rows", legacy_fetchall, rows.fetchall, list_cursor, 20),
+        ("authenticated request", legacy_auth, record_auth, auth_cursor, 200000),
+    ]:
+        for label, fn in (("dict(zip())", legacy), ("records", current)):
+            seconds = min(timeit.repeat(lambda: fn(cursor), number=number, repeat=5)) / number
+            results.append((name, label, seconds * 1e6, peak_bytes(fn, cursor)))
+
+    print(f"{'case':<24} {'mapper':<12} {'us/call':>12} {'peak bytes':>12}")
+    for name, label, micros, peak in results:
+        print(f"{name:<24} {label:<12} {micros:>12.2f} {peak:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -47,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'users.middleware.QueryTimingMiddleware',  # First, so its timings cover the whole stack
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -103,10 +104,34 @@ DATABASES = {
 
 'PORT': os.getenv('DB_PORT'),
 
+# Keep connections open between requests and ping them before reuse
+'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+
+'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
+
+'OPTIONS': {},
+
 }
 
 }
 
+# Pooled connections (psycopg 3 + psycopg[pool] >= 3.2); replaces CONN_MAX_AGE persistence.
+# Django skips CONN_HEALTH_CHECKS for pooled connections, so the pool itself runs
+# check_connection (an empty query) on each checkout and replaces a connection the
+# server has dropped (restart, failover, idle timeout) before a request gets it.
+DB_POOL_ENABLED = os.getenv('DB_POOL_ENABLED', 'False') == 'True'
+if DB_POOL_ENABLED:
+    from psycopg_pool import ConnectionPool
+
+    DATABASES['default']['CONN_MAX_AGE'] = 0  # Pooling doesn't support persistent connections
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+        'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+        'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', 300)),  # seconds before an idle connection is closed
+        'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),  # seconds to wait for a free connection
+        'check': ConnectionPool.check_connection,
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -155,3 +180,98 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:3000",
 ]
 CORS_ALLOW_CREDENTIALS = True
+
+# Process-local cache of auth-relevant user fields used by JWTAuthentication
+AUTH_USER_CACHE_MAX_SIZE = int(os.getenv('AUTH_USER_CACHE_MAX_SIZE', 10000))
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', 60))  # seconds
+
+# Stateless JWT auth: sign role/approval claims into access tokens and skip the per-request user query
+JWT_STATELESS_AUTH = os.getenv('JWT_STATELESS_AUTH', 'False') == 'True'
+JWT_REVOCATION_REFRESH_INTERVAL = int(os.getenv('JWT_REVOCATION_REFRESH_INTERVAL', 30))  # seconds
+
+# Verified JWT payloads kept per process until each token expires (0 disables)
+JWT_VERIFIED_CACHE_MAX_SIZE = int(os.getenv('JWT_VERIFIED_CACHE_MAX_SIZE', 10000))
+
+# Login throttling, checked before the password is hashed. Limits are per
+# LOGIN_THROTTLE_WINDOW seconds; 0 disables a limit. Backend 'memory' (per process)
+# or 'postgres' (shared by all workers through the login_throttle table).
+LOGIN_THROTTLE_BACKEND = os.getenv('LOGIN_THROTTLE_BACKEND', 'memory')
+LOGIN_THROTTLE_WINDOW = int(os.getenv('LOGIN_THROTTLE_WINDOW', 60))  # seconds
+LOGIN_THROTTLE_IP_LIMIT = int(os.getenv('LOGIN_THROTTLE_IP_LIMIT', 20))  # attempts per IP
+LOGIN_THROTTLE_EMAIL_LIMIT = int(os.getenv('LOGIN_THROTTLE_EMAIL_LIMIT', 5))  # failed attempts per email
+LOGIN_THROTTLE_MAX_KEYS = int(os.getenv('LOGIN_THROTTLE_MAX_KEYS', 100000))  # memory backend bound
+LOGIN_THROTTLE_IP_HEADER = os.getenv('LOGIN_THROTTLE_IP_HEADER', 'REMOTE_ADDR')  # e.g. HTTP_X_REAL_IP behind a proxy
+
+# Shared cache (point CACHE_BACKEND/CACHE_LOCATION at Redis or Memcached to share across workers)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# How long dashboard counts may be served from the shared cache
+DASHBOARD_STATS_CACHE_TTL = int(os.getenv('DASHBOARD_STATS_CACHE_TTL', 30))  # seconds
+
+# Default page size for the artist works list endpoint
+ARTIST_WORKS_PAGE_SIZE = int(os.getenv('ARTIST_WORKS_PAGE_SIZE', 20))
+
+# Default page size for the keyset-paginated pending users endpoint
+PENDING_USERS_PAGE_SIZE = int(os.getenv('PENDING_USERS_PAGE_SIZE', 50))
+
+# Default page size for the user and artist work search endpoints
+SEARCH_PAGE_SIZE = int(os.getenv('SEARCH_PAGE_SIZE', 20))
+
+# Rows accepted by the import upload endpoint; it hashes in-request, so bigger files
+# go through `manage.py import_users`
+IMPORT_MAX_ROWS = int(os.getenv('IMPORT_MAX_ROWS', 200))
+
+# Hashing pools are per web worker process, so size them as CPU count / web workers:
+# N workers each spawning cpu_count hashers oversubscribe the host and slow every login.
+# WEB_CONCURRENCY (also read by gunicorn) is the number of web workers; when it is
+# unset the default is 2 hashers per process.
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 0))
+DEFAULT_HASH_WORKERS = max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY) if WEB_CONCURRENCY else 2
+
+# Worker processes hashing passwords during bulk user imports (set it to the CPU count
+# when running `manage.py import_users` on its own)
+IMPORT_HASH_WORKERS = int(os.getenv('IMPORT_HASH_WORKERS', DEFAULT_HASH_WORKERS))
+
+# Worker processes hashing passwords for signup and login (0 hashes on the request thread)
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', DEFAULT_HASH_WORKERS))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv('PASSWORD_HASH_MAX_QUEUE', 64))  # hashes queued before answering 503
+
+# Hasher for new passwords: 'pbkdf2' (Django's default) or 'argon2' (needs argon2-cffi).
+# Hashes made with the other hasher, or with older costs, are upgraded on login.
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'pbkdf2')
+ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', 2))
+ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', 19456))  # KiB
+ARGON2_PARALLELISM = int(os.getenv('ARGON2_PARALLELISM', 1))
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'users.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+if PASSWORD_HASHER == 'argon2':
+    PASSWORD_HASHERS.insert(0, PASSWORD_HASHERS.pop(2))
+
+# Async connection pool used by the ASGI views (users/async_models.py); one pool per event loop
+ASYNC_DB_POOL_MIN_SIZE = int(os.getenv('ASYNC_DB_POOL_MIN_SIZE', 1))
+ASYNC_DB_POOL_MAX_SIZE = int(os.getenv('ASYNC_DB_POOL_MAX_SIZE', 10))
+
+# Approval-queue event stream: 'local' (in-process) or 'postgres' (LISTEN/NOTIFY, for several processes)
+EVENTS_BACKEND = os.getenv('EVENTS_BACKEND', 'local')
+EVENTS_MAX_QUEUE = int(os.getenv('EVENTS_MAX_QUEUE', 100))  # events buffered per stream before it must resync
+SSE_KEEPALIVE_INTERVAL = int(os.getenv('SSE_KEEPALIVE_INTERVAL', 15))  # seconds
+
+# Deferred writer for non-critical inserts such as audit events (users/deferred.py)
+DEFERRED_WRITES_MAX_BATCH = int(os.getenv('DEFERRED_WRITES_MAX_BATCH', 500))  # rows per flush
+DEFERRED_WRITES_FLUSH_INTERVAL = float(os.getenv('DEFERRED_WRITES_FLUSH_INTERVAL', 1.0))  # seconds a row may wait
+DEFERRED_WRITES_MAX_QUEUE = int(os.getenv('DEFERRED_WRITES_MAX_QUEUE', 10000))  # rows buffered before dropping
+DEFERRED_WRITES_DRAIN_TIMEOUT = float(os.getenv('DEFERRED_WRITES_DRAIN_TIMEOUT', 10))  # seconds to flush at exit
+
+# Bearer token required to scrape /metrics (unset: /metrics answers 404 unless DEBUG is on)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
@@ -0,0 +1,171 @@
+import asyncio
+import weakref
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+
+from .rows import record_row_factory
+from .models import (
+    AUTH_USER_SQL, LOGIN_USER_SQL, DATA_VERSION_SQL, USER_STATS_SQL, ARTIST_WORKS_COUNT_SQL, ARTIST_WORKS_RECENT_SQL,
+    CREATE_REFRESH_FAMILY_SQL, ROTATE_REFRESH_FAMILY_SQL, UPDATE_PASSWORD_HASH_SQL, auth_user_cache,
+)
+
+try:
+    from psycopg.conninfo import make_conninfo
+    from psycopg_pool import AsyncConnectionPool
+except ImportError:  # pragma: no cover - optional dependency
+    make_conninfo = AsyncConnectionPool = None
+
+# DATABASES OPTIONS consumed by Django itself rather than passed on to libpq
+DJANGO_ONLY_OPTIONS = {"pool", "isolation_level", "server_side_binding", "assume_role"}
+
+# One pool per event loop: a pool's connections are bound to the loop that opened them
+_pools = weakref.WeakKeyDictionary()
+
+
+def _conninfo():
+    """
+    Builds a libpq connection string from DATABASES["default"], including
+    its OPTIONS (sslmode and the like), with values quoted as needed.
+    """
+    db = settings.DATABASES["default"]
+    params = {
+        "dbname": db.get("NAME"),
+        "user": db.get("USER"),
+        "password": db.get("PASSWORD"),
+        "host": db.get("HOST"),
+        "port": db.get("PORT"),
+    }
+    params.update(
+        (key, value) for key, value in db.get("OPTIONS", {}).items() if key not in DJANGO_ONLY_OPTIONS
+    )
+    return make_conninfo(**{key: value for key, value in params.items() if value not in (None, "")})
+
+
+async def _open_pool():
+    pool = AsyncConnectionPool(
+        _conninfo(),
+        min_size=getattr(settings, "ASYNC_DB_POOL_MIN_SIZE", 1),
+        max_size=getattr(settings, "ASYNC_DB_POOL_MAX_SIZE", 10),
+        kwargs={"autocommit": True, "row_factory": record_row_factory},
+        open=False,
+    )
+    await pool.open()
+    return pool
+
+
+async def get_pool():
+    """
+    Returns the async connection pool of the running event loop, opening it on first use.
+    """
+    if AsyncConnectionPool is None:
+        raise ImproperlyConfigured("The async data layer requires the 'psycopg[pool]' package.")
+
+    loop = asyncio.get_running_loop()
+    opening = _pools.get(loop)
+    if opening is None:
+        # Concurrent first requests all await the same opening task
+        opening = _pools[loop] = loop.create_task(_open_pool())
+    return await opening
+
+
+async def _fetchone(sql, params=None):
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        cursor = await conn.execute(sql, params)
+        return await cursor.fetchone()
+
+
+class AsyncUserModel:
+    """
+    Async counterparts of the read paths of UserModel, for the ASGI views.
+    Shares the auth cache and dashboard stats cache with UserModel.
+    """
+
+    @staticmethod
+    async def get_login_user(email):
+        """
+        Retrieves only the columns login needs (including the password hash) by email.
+        """
+        return await _fetchone(LOGIN_USER_SQL, [email])
+
+    @staticmethod
+    async def update_password_hash(user_id, new_hash, old_hash):
+        """
+        Stores a rehashed password if the stored hash is still `old_hash`.
+        Returns True if it was updated.
+        """
+        return await _fetchone(UPDATE_PASSWORD_HASH_SQL, [new_hash, user_id, old_hash]) is not None
+
+    @staticmethod
+    async def get_auth_user(user_id):
+        """
+        Retrieves the auth-relevant fields of a user, served from the
+        process-local auth cache when possible.
+        """
+        user = auth_user_cache.get(user_id)
+        if user is not None:
+            return user
+
+        user = await _fetchone(AUTH_USER_SQL, [user_id])
+        if user is None:
+            return None
+
+        auth_user_cache.set(user_id, user)
+        return user
+
+    @staticmethod
+    async def create_refresh_token_family(user_id):
+        """
+        Starts a refresh token family for a new login session. Returns its id.
+        """
+        return (await _fetchone(CREATE_REFRESH_FAMILY_SQL, [user_id]))["id"]
+
+    @staticmethod
+    async def rotate_refresh_token_family(family_id, user_id, generation, token_version):
+        """
+        Rotates a refresh token family, like UserModel.rotate_refresh_token_family.
+        """
+        return await _fetchone(ROTATE_REFRESH_FAMILY_SQL, {
+            "family_id": family_id, "user_id": user_id,
+            "generation": generation, "token_version": token_version,
+        })
+
+    @staticmethod
+    async def get_data_version():
+        """
+        Returns the users data version (see UserModel.get_data_version).
+        """
+        return (await _fetchone(DATA_VERSION_SQL))["version"]
+
+    @staticmethod
+    async def get_user_stats(version=None):
+        """
+        Returns every role/approval bucket count, cached like UserModel.get_user_stats.
+        """
+        if version is None:
+            version = await AsyncUserModel.get_data_version()
+        key = f"users:stats:v{version}"
+        stats = await cache.aget(key)
+        if stats is not None:
+            return stats
+
+        stats = (await _fetchone(USER_STATS_SQL))._asdict()
+        await cache.aset(key, stats, getattr(settings, "DASHBOARD_STATS_CACHE_TTL", 30))
+        return stats
+
+    @staticmethod
+    async def get_artist_works_summary(artist_id, limit=5):
+        """
+        Returns the total number of works of an artist and the `limit` most recent ones.
+        """
+        pool = await get_pool()
+        async with pool.connection() as conn:
+            cursor = await conn.execute(ARTIST_WORKS_COUNT_SQL, [artist_id])
+            total = (await cursor.fetchone())["total"]
+            if not total:
+                return 0, []
+
+            cursor = await conn.execute(ARTIST_WORKS_RECENT_SQL, [artist_id, limit])
+            return total, await cursor.fetchall()
@@ -1,30 +1,75 @@
 import jwt
 import os
 import datetime
+import time
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.db import connection
 from rest_framework import exceptions
 from rest_framework.authentication import BaseAuthentication
 from .models import UserModel
+from .async_models import AsyncUserModel
+from .revocation import TokenRevocationList, RevokedTokenFamilies
+from .metrics import timed
+from .jwt_utils import decode_jwt_token
 
 SECRET_KEY = os.getenv('SECRET_KEY')
 
-# Updated User class to properly handle attributes
+ACCESS_TOKEN_LIFETIME = datetime.timedelta(minutes=30)
+REFRESH_TOKEN_LIFETIME = datetime.timedelta(days=7)
+
+token_revocations = TokenRevocationList(
+    lifetime=ACCESS_TOKEN_LIFETIME,
+    refresh_interval=getattr(settings, "JWT_REVOCATION_REFRESH_INTERVAL", 30),
+)
+
+# Refresh token families revoked after reuse detection; also refuses their access tokens
+token_families = RevokedTokenFamilies(
+    lifetime=REFRESH_TOKEN_LIFETIME,
+    refresh_interval=getattr(settings, "JWT_REVOCATION_REFRESH_INTERVAL", 30),
+)
+
+def revoke_tokens(user_id):
+    """
+    Revokes every access and refresh token issued to a user. This process
+    refuses them at once; other processes on their next revocation refresh.
+    Returns the new token version, or None if the user does not exist.
+    """
+    token_version = UserModel.revoke_user_tokens(user_id)
+    if token_version is not None:
+        token_revocations.mark_revoked(user_id, token_version)
+    return token_version
+
 class User:
-    def __init__(self, **kwargs):
-        # Explicitly set role_type from kwargs or default to None
-        self.role_type = kwargs.get('role_type', None)
-        
-        # Now set all other attributes
-        for key, value in kwargs.items():
-            setattr(self, key, value)
-            
-        # Set authentication properties needed by DRF
-        self.is_authenticated = True
-        self.is_active = kwargs.get('is_approved', False)
-    
+    """
+    Authenticated user attached to request.user. Fixed slots keep it compact;
+    it is built straight from an auth row (see AUTH_USER_COLUMNS) or token claims.
+    """
+    __slots__ = ('id', 'email', 'first_name', 'last_name', 'role_type', 'is_approved', 'token_version')
+
+    # Authentication properties needed by DRF
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, id, role_type=None, is_approved=False, email=None, first_name=None, last_name=None, token_version=0):
+        self.id = id
+        self.role_type = role_type
+        self.is_approved = is_approved
+        self.email = email
+        self.first_name = first_name
+        self.last_name = last_name
+        self.token_version = token_version
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(row.id, row.role_type, row.is_approved, row.email, row.first_name, row.last_name, row.token_version)
+
     def __str__(self):
-        return self.email if hasattr(self, 'email') else str(self.id)
+        return self.email if self.email else str(self.id)
+
+    @property
+    def is_active(self):
+        return bool(self.is_approved)
         
     @property
     def is_superuser(self):
@@ -32,18 +77,41 @@ class User:
 
 class JWTHandler:
     @staticmethod
-    def generate_tokens(user_id):
-        access_token_exp = datetime.datetime.utcnow() + datetime.timedelta(minutes=30)
-        refresh_token_exp = datetime.datetime.utcnow() + datetime.timedelta(days=7)
+    def generate_tokens(user_id, user=None, family=None):
+        """
+        Generates an access and refresh token pair.
+        With JWT_STATELESS_AUTH enabled and a `user` dict given, the access
+        token also carries the claims needed to authenticate without a query.
+        `family` is the (family_id, generation) of the refresh token family
+        the pair belongs to (see UserModel.rotate_refresh_token_family).
+        """
+        access_token_exp = datetime.datetime.utcnow() + ACCESS_TOKEN_LIFETIME
+        refresh_token_exp = datetime.datetime.utcnow() + REFRESH_TOKEN_LIFETIME
+
+        access_payload = {"user_id": user_id, "exp": access_token_exp, "typ": "access"}
+        if user is not None:
+            access_payload["ver"] = user.get("token_version", 0)
+            if getattr(settings, "JWT_STATELESS_AUTH", False):
+                access_payload["role_type"] = user["role_type"]
+                access_payload["is_approved"] = bool(user["is_approved"])
+        if family is not None:
+            access_payload["fam"] = family[0]
 
         access_token = jwt.encode(
-            {"user_id": user_id, "exp": access_token_exp},
+            access_payload,
             SECRET_KEY,
             algorithm="HS256"
         )
 
+        refresh_payload = {"user_id": user_id, "exp": refresh_token_exp, "typ": "refresh"}
+        if user is not None:
+            refresh_payload["ver"] = access_payload["ver"]
+        if family is not None:
+            refresh_payload["fam"] = family[0]
+            refresh_payload["gen"] = family[1]
+
         refresh_token = jwt.encode(
-            {"user_id": user_id, "exp": refresh_token_exp},
+            refresh_payload,
             SECRET_KEY,
             algorithm="HS256"
         )
@@ -52,42 +120,111 @@ class JWTHandler:
 
     @staticmethod
     def decode_token(token):
-        try:
-            decoded = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-            return decoded
-        except jwt.ExpiredSignatureError:
-            return None
-        except jwt.InvalidTokenError:
-            return None
+        # Verified payloads are cached until the token expires (see jwt_utils)
+        return decode_jwt_token(token)
 
 
 class JWTAuthentication(BaseAuthentication):
     def authenticate(self, request):
+        with timed("auth"):  # Server-Timing phase, see QueryTimingMiddleware
+            token = self.get_token(request)
+            if token is None:
+                return None
+
+            payload = self.get_payload(token)
+            user = self.authenticate_claims(payload)
+            if user is None:
+                user_row = UserModel.get_auth_user(payload.get('user_id'))  # Cached auth-field lookup
+                user = self.authenticate_user(payload, user_row)
+
+        return (user, token)  # Now returning a User object with necessary properties
+
+    def get_token(self, request):
         auth_header = request.META.get('HTTP_AUTHORIZATION', '')
         if not auth_header.startswith('Bearer '):
             return None
-            
+
         token = auth_header.split(' ')[1]
-        if not token:
-            return None
-            
+        return token or None
+
+    def get_payload(self, token):
         payload = JWTHandler.decode_token(token)
-        if payload is None:
+        if payload is None or not self.is_access_payload(payload):
             raise exceptions.AuthenticationFailed('Invalid token or token expired')
-            
+
+        # Access tokens of a family revoked for refresh token reuse
+        if 'fam' in payload and token_families.is_revoked(payload['fam']):
+            raise exceptions.AuthenticationFailed('Token has been revoked')
+        return payload
+
+    @staticmethod
+    def is_access_payload(payload):
+        """
+        Tells access tokens from refresh tokens. Tokens issued before the
+        "typ" claim existed are access tokens only if they expire within an
+        access token lifetime; refresh tokens lived far longer.
+        """
+        if 'typ' in payload:
+            return payload['typ'] == 'access'
+        if 'gen' in payload:
+            return False
+        return payload.get('exp', 0) - time.time() <= ACCESS_TOKEN_LIFETIME.total_seconds()
+
+    def authenticate_claims(self, payload):
+        """
+        Stateless mode: trust the signed claims, checking only the in-memory
+        revocation list. Returns None when the token must be checked against the database.
+        """
+        if not getattr(settings, "JWT_STATELESS_AUTH", False) or 'role_type' not in payload:
+            return None
+
         user_id = payload.get('user_id')
-        user_dict = UserModel.get_user_by_id(user_id)  # Using your raw SQL method
-        
-        if not user_dict:
+        if token_revocations.is_revoked(user_id, payload.get('ver', 0)):
+            raise exceptions.AuthenticationFailed('Token has been revoked')
+
+        if not payload.get('is_approved', False):
+            raise exceptions.AuthenticationFailed('User not approved')
+
+        return User(id=user_id, role_type=payload['role_type'], is_approved=True)
+
+    def authenticate_user(self, payload, user_row):
+        if not user_row:
             raise exceptions.AuthenticationFailed('User not found')
             
-        if not user_dict.get('is_approved', False):
+        if not user_row.is_approved:
             raise exceptions.AuthenticationFailed('User not approved')
+
+        if user_row.token_version > payload.get('ver', 0):
+            raise exceptions.AuthenticationFailed('Token has been revoked')
             
-        # Convert the dictionary to a User object
-        user = User(**user_dict)
-            
-        return (user, token)  # Now returning a User object with necessary properties
+        # Build the User object straight from the auth row
+        return User.from_row(user_row)
         
     def authenticate_header(self, request):
-        return 'Bearer'
\ No newline at end of file
+        return 'Bearer'
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication for async views, loading the user through AsyncUserModel.
+    """
+    async def authenticate_async(self, request):
+        with timed("auth"):
+            token = self.get_token(request)
+            if token is None:
+                return None
+
+            # Refreshes query the database, which must not run on the event loop
+            if token_families.refresh_due():
+                await sync_to_async(token_families.refresh)()
+            if getattr(settings, "JWT_STATELESS_AUTH", False) and token_revocations.refresh_due():
+                await sync_to_async(token_revocations.refresh)()
+
+            payload = self.get_payload(token)
+
+            user = self.authenticate_claims(payload)
+            if user is None:
+                user_row = await AsyncUserModel.get_auth_user(payload.get('user_id'))
+                user = self.authenticate_user(payload, user_row)
+
+        return (user, token)
@@ -0,0 +1,27 @@
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+
+def data_etag(name, version):
+    """
+    ETag of a response that only depends on the users data version.
+    """
+    return quote_etag(f"{name}-{version}")
+
+
+def not_modified(request, etag):
+    """
+    Returns a 304 response (or 412 for a failed If-Match) when the request's
+    conditional headers match `etag`, else None.
+    """
+    response = get_conditional_response(request, etag=etag)
+    return with_etag(response, etag) if response is not None else None
+
+
+def with_etag(response, etag):
+    """
+    Sets the ETag and makes clients revalidate it on every poll.
+    """
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
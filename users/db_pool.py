@@ -0,0 +1,35 @@
+from django.db import connections
+
+
+def pool_stats(alias="default"):
+    """
+    Returns checkout, wait-time and saturation metrics of the database
+    connection pool, or None when pooling is disabled.
+    """
+    pool = getattr(connections[alias], "pool", None)
+    if pool is None:
+        return None
+
+    stats = pool.get_stats()
+    size = stats.get("pool_size", 0)
+    available = stats.get("pool_available", 0)
+    max_size = stats.get("pool_max", pool.max_size) or 1
+    checkouts = stats.get("requests_num", 0)
+    wait_ms = stats.get("requests_wait_ms", 0)
+
+    return {
+        "min_size": stats.get("pool_min", pool.min_size),
+        "max_size": max_size,
+        "size": size,
+        "available": available,
+        "in_use": size - available,
+        "saturation": (size - available) / max_size,
+        "waiting": stats.get("requests_waiting", 0),
+        "checkouts": checkouts,
+        "queued_checkouts": stats.get("requests_queued", 0),
+        "checkout_errors": stats.get("requests_errors", 0),
+        "wait_ms_total": wait_ms,
+        "wait_ms_avg": wait_ms / checkouts if checkouts else 0.0,
+        "connections_opened": stats.get("connections_num", 0),
+        "bad_connections_returned": stats.get("returns_bad", 0),
+    }
@@ -0,0 +1,194 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from itertools import groupby
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class DeferredWriter:
+    """
+    Background thread that takes non-critical inserts (audit rows and the
+    like) off the request path. Rows are buffered in a bounded queue and
+    written with one multi-row INSERT per table once `max_batch` rows are
+    waiting or `flush_interval` seconds after the first buffered row.
+
+    Rows are best effort: when the queue is full they are dropped (and
+    counted) rather than blocking the request, and a batch that fails to
+    insert is logged and dropped. Buffered rows are written at exit.
+    """
+    def __init__(self, max_batch=500, flush_interval=1.0, max_queue=10000):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.written = 0
+        self.dropped = 0
+
+    def put(self, table, columns, values):
+        """
+        Queues one row for insertion. Never blocks; returns False if the row was dropped.
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((table, columns, values))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def _ensure_started(self):
+        # Also restarts the thread in a forked worker, which does not inherit it
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="deferred-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.drain, getattr(settings, "DEFERRED_WRITES_DRAIN_TIMEOUT", 10))
+
+    def drain(self, timeout=None):
+        """
+        Writes every buffered row and stops the thread, waiting at most `timeout` seconds.
+        """
+        thread = self._thread
+        if thread is None or not thread.is_alive() or self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Deferred writer queue full at shutdown; %d rows lost", self.depth())
+            return
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.warning("Deferred writer did not drain within %ss; %d rows lost", timeout, self.depth())
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect()
+            if batch:
+                self._write(batch)
+        # Rows queued after the stop marker still get written
+        while True:
+            batch = []
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    batch.append(item)
+            if not batch:
+                return
+            self._write(batch)
+
+    def _collect(self):
+        """
+        Waits for a row, then gathers more until the batch is full or the
+        flush interval has passed. Returns (batch, stopping).
+        """
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _write(self, batch):
+        start = time.perf_counter()
+        batch.sort(key=lambda item: (item[0], item[1]))  # stable: keeps each table's rows in order
+        try:
+            for (table, columns), items in groupby(batch, key=lambda item: (item[0], item[1])):
+                items = list(items)
+                row_sql = "(" + ", ".join(["%s"] * len(columns)) + ")"
+                sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([row_sql] * len(items))};"
+                try:
+                    with connection.cursor() as cursor:
+                        cursor.execute(sql, [value for _, _, values in items for value in values])
+                except DatabaseError:
+                    logger.warning("Deferred insert of %d rows into %s failed; dropping them",
+                                   len(items), table, exc_info=True)
+                    with self._lock:
+                        self.dropped += len(items)
+                else:
+                    with self._lock:
+                        self.written += len(items)
+        finally:
+            # Like the end of a request: honours CONN_MAX_AGE and returns pooled connections
+            close_old_connections()
+        registry.observe("deferred_writes_flush_seconds", (), time.perf_counter() - start)
+
+
+registry.describe("deferred_writes_flush_seconds", "histogram", "Time spent writing one batch of deferred rows.")
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_deferred_writer():
+    """
+    Returns the process-wide DeferredWriter configured by the DEFERRED_WRITES_* settings.
+    """
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = DeferredWriter(
+                    max_batch=getattr(settings, "DEFERRED_WRITES_MAX_BATCH", 500),
+                    flush_interval=getattr(settings, "DEFERRED_WRITES_FLUSH_INTERVAL", 1.0),
+                    max_queue=getattr(settings, "DEFERRED_WRITES_MAX_QUEUE", 10000),
+                )
+    return _writer
+
+
+def defer_insert(table, columns, rows):
+    """
+    Queues `rows` (tuples matching `columns`) for insertion into `table`
+    once the current transaction commits (right away in autocommit).
+    """
+    def enqueue():
+        writer = get_deferred_writer()
+        for values in rows:
+            writer.put(table, columns, values)
+
+    transaction.on_commit(enqueue)
+
+
+@registry.register_collector
+def deferred_writes_metrics():
+    if _writer is None:
+        return []
+    return [
+        ("deferred_writes_queue_depth", "gauge", "Rows buffered for the deferred writer.", (), _writer.depth()),
+        ("deferred_writes_written_total", "counter", "Rows written by the deferred writer.", (), _writer.written),
+        ("deferred_writes_dropped_total", "counter", "Rows dropped (queue full or insert failed).", (), _writer.dropped),
+    ]
@@ -0,0 +1,212 @@
+import asyncio
+import itertools
+import json
+import logging
+import threading
+import weakref
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+try:
+    import psycopg
+except ImportError:  # pragma: no cover - optional dependency
+    psycopg = None
+
+logger = logging.getLogger(__name__)
+
+# Postgres NOTIFY channel used by the "postgres" backend
+CHANNEL = "users_events"
+
+Event = namedtuple("Event", ["id", "name", "data"])
+
+# Queued in place of the events a slow subscriber missed
+RESYNC = Event(None, "resync", {})
+
+# Longest id list an event carries (bulk approvals may hold 1000 ids)
+MAX_EVENT_IDS = 100
+
+# pg_notify rejects payloads of 8000 bytes or more
+MAX_NOTIFY_PAYLOAD = 7999
+
+
+class Subscription:
+    """
+    Bounded queue of events for one streaming client, bound to its event loop.
+    If the client falls behind, its backlog is replaced by a single RESYNC
+    event telling it to reload instead of growing without limit.
+    """
+    def __init__(self, loop, max_queue):
+        self.loop = loop
+        self.queue = asyncio.Queue(max_queue)
+
+    def deliver(self, event):
+        # Runs on the subscriber's loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def get_nowait(self):
+        """
+        Returns the next already-queued event, or None.
+        """
+        try:
+            return self.queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+
+
+class LocalBroker:
+    """
+    In-process broker: events published by any thread reach the streams
+    served by this process. Enough for a single ASGI process.
+    """
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self):
+        """
+        Subscribes a stream running on the current event loop.
+        """
+        subscription = Subscription(asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, name, data):
+        self.dispatch(name, data)
+
+    def dispatch(self, name, data, loop=None):
+        """
+        Hands an event to every subscriber (only those on `loop`, if given).
+        Safe to call from any thread.
+        """
+        with self._lock:
+            if not self._subscribers:
+                return
+            subscribers = [s for s in self._subscribers if loop is None or s.loop is loop]
+        event = Event(next(self._ids), name, data)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                self.unsubscribe(subscription)  # Its loop has been closed
+
+
+class PostgresBroker(LocalBroker):
+    """
+    Delivers events across processes with Postgres LISTEN/NOTIFY. Publishing
+    sends a NOTIFY; each event loop with subscribers keeps one LISTEN
+    connection and fans the notifications out to its local streams.
+    """
+    RECONNECT_DELAY = 5  # seconds
+
+    def __init__(self, max_queue=100):
+        super().__init__(max_queue)
+        self._listeners = weakref.WeakKeyDictionary()  # loop -> listener task
+
+    def subscribe(self):
+        if psycopg is None:
+            raise RuntimeError("EVENTS_BACKEND 'postgres' requires the 'psycopg' package.")
+        subscription = super().subscribe()
+        loop = subscription.loop
+        if loop not in self._listeners:
+            self._listeners[loop] = loop.create_task(self._listen(loop))
+        return subscription
+
+    def publish(self, name, data):
+        payload = json.dumps({"name": name, "data": data}, cls=DjangoJSONEncoder)
+        if len(payload.encode()) > MAX_NOTIFY_PAYLOAD:
+            # Too big for NOTIFY; make the streams reload rather than miss the change
+            logger.warning("%s event too large for NOTIFY; sending resync", name)
+            payload = json.dumps({"name": RESYNC.name, "data": RESYNC.data})
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s);", [CHANNEL, payload])
+
+    async def _listen(self, loop):
+        from .async_models import _conninfo
+
+        while True:
+            listening = False
+            try:
+                async with await psycopg.AsyncConnection.connect(_conninfo(), autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {CHANNEL};")
+                    listening = True
+                    async for notify in conn.notifies():
+                        message = json.loads(notify.payload)
+                        self.dispatch(message["name"], message["data"], loop=loop)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Event listener disconnected; reconnecting", exc_info=True)
+
+            if listening:
+                # Notifications sent while disconnected are lost; tell streams to reload
+                with self._lock:
+                    subscribers = [s for s in self._subscribers if s.loop is loop]
+                for subscription in subscribers:
+                    subscription.deliver(RESYNC)
+            await asyncio.sleep(self.RECONNECT_DELAY)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """
+    Returns the process-wide broker chosen by EVENTS_BACKEND ("local" or "postgres").
+    """
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                backend = getattr(settings, "EVENTS_BACKEND", "local")
+                broker_class = PostgresBroker if backend == "postgres" else LocalBroker
+                _broker = broker_class(max_queue=getattr(settings, "EVENTS_MAX_QUEUE", 100))
+    return _broker
+
+
+def cap_ids(data):
+    """
+    Cuts id lists in an event payload to MAX_EVENT_IDS entries. A cut list
+    `key` gets its full length as `key_total`, and the payload is flagged "truncated".
+    """
+    capped = dict(data)
+    for key, value in data.items():
+        if isinstance(value, list) and len(value) > MAX_EVENT_IDS:
+            capped[key] = value[:MAX_EVENT_IDS]
+            capped[f"{key}_total"] = len(value)
+            capped["truncated"] = True
+    return capped
+
+
+def publish_on_commit(name, data):
+    """
+    Publishes an event once the current transaction commits (right away in autocommit).
+    """
+    data = cap_ids(data)
+
+    def publish():
+        try:
+            get_broker().publish(name, data)
+        except Exception:
+            # Streams are best effort; never fail the write that triggered them
+            logger.warning("Publishing %s event failed", name, exc_info=True)
+
+    transaction.on_commit(publish)
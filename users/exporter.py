@@ -0,0 +1,90 @@
+import csv
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+
+# Exportable tables and their columns (never the password hash), ordered by id
+EXPORT_DATASETS = {
+    "users": (
+        "id", "first_name", "last_name", "email", "phone", "dob", "gender", "address",
+        "role_type", "is_approved", "created_at", "updated_at",
+    ),
+    "artist_works": ("id", "artist_id", "title", "created_at", "updated_at"),
+}
+EXPORT_FORMATS = ("csv", "ndjson")
+
+
+class _Echo:
+    """
+    File-like object whose write() returns what was written, for csv.writer.
+    """
+    def write(self, value):
+        return value
+
+
+def iter_batches(dataset, batch_size=2000):
+    """
+    Yields lists of rows of `dataset`, read through a server-side cursor
+    so only one batch is held in memory at a time.
+    """
+    columns = EXPORT_DATASETS[dataset]
+    # chunked_cursor() is a named (server-side) cursor on PostgreSQL
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(columns)} FROM {dataset} ORDER BY id;")
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                return
+            yield batch
+
+
+def export_chunks(dataset, fmt, batch_size=2000):
+    """
+    Yields the export of `dataset` as text chunks, one per batch of rows.
+    """
+    columns = EXPORT_DATASETS[dataset]
+    if fmt == "csv":
+        writer = csv.writer(_Echo())
+        yield writer.writerow(columns)
+        for batch in iter_batches(dataset, batch_size):
+            yield "".join(writer.writerow(row) for row in batch)
+    elif fmt == "ndjson":
+        encoder = DjangoJSONEncoder()
+        for batch in iter_batches(dataset, batch_size):
+            yield "".join(encoder.encode(dict(zip(columns, row))) + "\n" for row in batch)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+
+def encode_chunks(chunks, compress=False):
+    """
+    Encodes text chunks as UTF-8, gzip-compressing them when `compress` is set.
+    """
+    if not compress:
+        for chunk in chunks:
+            yield chunk.encode()
+        return
+
+    compressor = zlib.compressobj(wbits=31)  # 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def aiter_sync(iterator):
+    """
+    Adapts a sync iterator for StreamingHttpResponse under ASGI, which would
+    otherwise read a sync iterator to the end before sending anything.
+    Each step runs on the request's sync thread, where its DB connection lives.
+    """
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    sentinel = object()
+    try:
+        while (chunk := await next_chunk(iterator, sentinel)) is not sentinel:
+            yield chunk
+    finally:
+        await sync_to_async(iterator.close, thread_sensitive=True)()
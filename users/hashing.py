@@ -0,0 +1,147 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+from .metrics import registry
+
+
+class HashingBusy(Exception):
+    """
+    Raised when the hashing pool already has its maximum number of queued hashes.
+    """
+    retry_after = 1  # seconds clients are asked to wait
+
+
+def _init_worker():
+    django.setup()
+
+
+def _verify(password, encoded):
+    """
+    Checks a password and, if the stored hash uses an outdated hasher or
+    cost, also returns a new hash of it (else None). Runs in a pool worker.
+    """
+    upgraded = []
+    valid = check_password(password, encoded, setter=lambda raw: upgraded.append(make_password(raw)))
+    return valid, (upgraded[0] if upgraded else None)
+
+
+class HashingPool:
+    """
+    Process pool for CPU-bound password hashing, so PBKDF2/argon2 work runs
+    outside the GIL of the serving process. Workers are spawned (not forked)
+    so they never inherit DB connections.
+
+    `max_queue` bounds the hashes waiting or running; past it submit()
+    raises HashingBusy instead of letting latency grow without limit.
+    With `workers=0` hashing runs on the calling thread.
+    """
+    def __init__(self, workers=None, max_queue=None):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.rejected = 0
+
+    def executor(self):
+        """
+        Returns the underlying executor (None in inline mode), starting it on first use.
+        """
+        if self.workers == 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def submit(self, fn, *args):
+        """
+        Schedules fn(*args) on the pool and returns a concurrent.futures.Future.
+        """
+        with self._lock:
+            if self.max_queue is not None and self.pending >= self.max_queue:
+                self.rejected += 1
+                raise HashingBusy()
+            self.pending += 1
+
+        try:
+            future = self.executor().submit(fn, *args)
+        except BaseException:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        with self._lock:
+            self.pending -= 1
+
+    def run(self, fn, *args):
+        if self.workers == 0:
+            return fn(*args)
+        return self.submit(fn, *args).result()
+
+    async def arun(self, fn, *args):
+        if self.workers == 0:
+            return await sync_to_async(fn, thread_sensitive=False)(*args)
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def map(self, fn, iterable, chunksize=64):
+        """
+        Unbounded bulk map for batch jobs such as imports.
+        """
+        executor = self.executor()
+        if executor is None:
+            return map(fn, iterable)
+        return executor.map(fn, iterable, chunksize=chunksize)
+
+
+# Request-path hashing (signup, login); bounded by PASSWORD_HASH_MAX_QUEUE
+login_pool = HashingPool(
+    workers=getattr(settings, "PASSWORD_HASH_WORKERS", None),
+    max_queue=getattr(settings, "PASSWORD_HASH_MAX_QUEUE", 64),
+)
+
+
+def hash_password(password):
+    """
+    Hashes a password with the preferred hasher on the pool.
+    Raises HashingBusy when the pool is saturated.
+    """
+    return login_pool.run(make_password, password)
+
+
+def verify_password(password, encoded):
+    """
+    Returns (valid, new_hash); new_hash is set when the stored hash should
+    be upgraded to the preferred hasher. Raises HashingBusy when the pool is saturated.
+    """
+    return login_pool.run(_verify, password, encoded)
+
+
+async def ahash_password(password):
+    return await login_pool.arun(make_password, password)
+
+
+async def averify_password(password, encoded):
+    return await login_pool.arun(_verify, password, encoded)
+
+
+@registry.register_collector
+def hashing_pool_metrics():
+    return [
+        ("password_hash_pool_pending", "gauge", "Password hashes queued or running.", (), login_pool.pending),
+        ("password_hash_pool_rejected_total", "counter", "Hashes refused because the queue was full.", (), login_pool.rejected),
+    ]
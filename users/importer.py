@@ -0,0 +1,127 @@
+import csv
+import json
+import logging
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import DatabaseError
+
+from .hashing import HashingPool
+from .models import UserModel
+from .serializers import UserImportSerializer
+
+logger = logging.getLogger(__name__)
+
+# Kept apart from the login pool so a large import never queues ahead of logins
+import_pool = HashingPool(workers=getattr(settings, "IMPORT_HASH_WORKERS", None))
+
+
+def iter_records(stream, fmt):
+    """
+    Yields (line_number, record) from a text stream of CSV or NDJSON.
+    `record` is None when the line cannot be parsed.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "ndjson":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield line_number, record if isinstance(record, dict) else None
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def _validate(record):
+    # Blank CSV cells mean "not provided", not an empty value
+    data = {key: value for key, value in record.items() if key and value not in ("", None)}
+    serializer = UserImportSerializer(data=data)
+    if not serializer.is_valid():
+        return None, serializer.errors
+    return serializer.validated_data, None
+
+
+def _insert_batch(batch, errors):
+    """
+    Inserts a batch of validated rows, falling back to one row at a time if
+    the batch statement fails so a single bad row cannot sink the rest.
+    Returns the number of users created.
+    """
+    users = [user for _, user in batch]
+    try:
+        created = UserModel.bulk_create_users(users)
+    except DatabaseError:
+        logger.warning("Batch insert failed, retrying row by row", exc_info=True)
+        created = {}
+        for line_number, user in batch:
+            try:
+                created.update(UserModel.bulk_create_users([user]))
+            except DatabaseError as e:
+                errors.append({"line": line_number, "email": user["email"], "errors": {"non_field_errors": [str(e)]}})
+        failed = {error["line"] for error in errors}
+        batch = [(line_number, user) for line_number, user in batch if line_number not in failed]
+
+    for line_number, user in batch:
+        if user["email"] not in created:
+            errors.append({
+                "line": line_number,
+                "email": user["email"],
+                "errors": {"email": ["User with this email already exists"]},
+            })
+    return len(created)
+
+
+def import_users(stream, fmt, batch_size=1000):
+    """
+    Streams users from CSV or NDJSON, validates each row with the signup
+    rules, hashes passwords on the process pool and inserts them in batches.
+    Invalid or duplicate rows are reported per line without aborting the import.
+    Returns {"created": int, "errors": [...]}.
+    """
+    created = 0
+    errors = []
+    batch = []
+    seen_emails = set()
+
+    def flush():
+        nonlocal created
+        hashes = import_pool.map(make_password, [user["password"] for _, user in batch], chunksize=64)
+        for (_, user), hashed in zip(batch, hashes):
+            user["password"] = hashed
+        created += _insert_batch(batch, errors)
+        batch.clear()
+
+    for line_number, record in iter_records(stream, fmt):
+        if record is None:
+            errors.append({"line": line_number, "email": None, "errors": {"non_field_errors": ["Malformed row"]}})
+            continue
+
+        user, row_errors = _validate(record)
+        if row_errors:
+            errors.append({"line": line_number, "email": record.get("email"), "errors": row_errors})
+            continue
+
+        email = user["email"]
+        if email in seen_emails:
+            errors.append({"line": line_number, "email": user["email"], "errors": {"email": ["Duplicate email in import"]}})
+            continue
+        seen_emails.add(email)
+
+        user.pop("confirm_password", None)
+        # Same approval rule as SignupView: artists are approved automatically
+        user["is_approved"] = user["role_type"] == "artist"
+        batch.append((line_number, user))
+
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+
+    return {"created": created, "errors": errors}
@@ -1,13 +1,23 @@
 # user/jwt_utils.py
 import os
 import jwt
+import time
+import hashlib
 from datetime import datetime, timedelta
 from django.conf import settings
+from .cache import TTLCache
 
 # Secret key for signing JWT tokens (replace with a secure key in production)
 # SECRET_KEY = 'your-secret-key'
 SECRET_KEY=os.getenv('SECRET_KEY')
 
+# Payloads of tokens whose signature was already verified, keyed by the token's
+# SHA-256 digest. Each entry expires with the token's own `exp`.
+verified_token_cache = TTLCache(
+    max_size=getattr(settings, "JWT_VERIFIED_CACHE_MAX_SIZE", 10000),
+    ttl=0,
+)
+
 def create_jwt_tokens(user_id, role):
     """
     Create access and refresh tokens for the given user ID and role.
@@ -32,11 +42,24 @@ def create_jwt_tokens(user_id, role):
 def decode_jwt_token(token):
     """
     Decode a JWT token and return the payload.
+    Tokens seen before are served from verified_token_cache until they expire.
     """
+    if isinstance(token, str):
+        token = token.encode()
+    key = hashlib.sha256(token).digest()
+    payload = verified_token_cache.get(key)
+    if payload is not None:
+        return dict(payload)  # Copy, so callers can't alter the cached payload
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-        return payload
     except jwt.ExpiredSignatureError:
         return None  # Token has expired
     except jwt.InvalidTokenError:
-        return None  # Invalid token
\ No newline at end of file
+        return None  # Invalid token
+
+    exp = payload.get('exp')
+    if exp is not None:
+        verified_token_cache.set(key, payload, ttl=exp - time.time())
+        payload = dict(payload)
+    return payload
@@ -0,0 +1,78 @@
+import json
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from users.models import (
+    ARTIST_WORKS_COUNT_SQL, ARTIST_WORKS_PAGE_SQL, ARTIST_WORKS_RECENT_SQL, AUTH_USER_SQL, LOGIN_USER_SQL,
+    REVOKED_FAMILIES_SQL, TOKEN_VERSIONS_CHANGED_SQL, UserModel,
+)
+
+
+def hot_queries():
+    """
+    Returns (name, sql, params, index_name) for the hot queries of
+    users/models.py (the same SQL the app runs) and the index each one is expected to use.
+    """
+    now = datetime.now(timezone.utc)
+    return [
+        ("get_login_user", LOGIN_USER_SQL, ["explain@example.com"], "users_email_uniq"),
+        ("get_auth_user", AUTH_USER_SQL, [1], "users_pkey"),
+        ("get_pending_users", *UserModel.pending_users_query(limit=51), "users_role_approved_created_idx"),
+        ("get_pending_users (next page)", *UserModel.pending_users_query(limit=51, after=(now, 1)),
+         "users_role_approved_created_idx"),
+        ("get_token_versions_changed_since", TOKEN_VERSIONS_CHANGED_SQL, [now], "users_revoked_updated_idx"),
+        ("get_refresh_families_revoked_since", REVOKED_FAMILIES_SQL, [now], "refresh_token_families_revoked_idx"),
+        ("get_pending_approval_requests", *UserModel.pending_approval_requests_query(limit=51),
+         "approval_requests_pending_idx"),
+        ("get_artist_works_summary (count)", ARTIST_WORKS_COUNT_SQL, [1], "artist_works_artist_created_idx"),
+        ("get_artist_works_summary (recent)", ARTIST_WORKS_RECENT_SQL, [1, 5], "artist_works_artist_created_idx"),
+        ("get_artist_works_page", ARTIST_WORKS_PAGE_SQL, [1, 21, 0], "artist_works_artist_created_idx"),
+        ("search_users", *UserModel.search_users_query("explain", limit=21), "users_search_trgm_idx"),
+        ("search_artist_works", *UserModel.search_artist_works_query("explain", limit=21),
+         "artist_works_title_trgm_idx"),
+    ]
+
+
+def _plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+class Command(BaseCommand):
+    help = "Runs EXPLAIN on the hot raw SQL queries and verifies each one uses its index."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--allow-seqscan",
+            action="store_true",
+            help="Plan with sequential scans enabled (on small tables the planner may legitimately prefer them).",
+        )
+
+    def handle(self, *args, **options):
+        failures = []
+
+        for name, sql, params, index_name in hot_queries():
+            with transaction.atomic(), connection.cursor() as cursor:
+                if not options["allow_seqscan"]:
+                    # Only checks that the index is usable, whatever the table size
+                    cursor.execute("SET LOCAL enable_seqscan = off;")
+                cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+                plan = cursor.fetchone()[0]
+
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+
+            used = {node["Index Name"] for node in _plan_nodes(plan[0]["Plan"]) if "Index Name" in node}
+            if index_name in used:
+                self.stdout.write(self.style.SUCCESS(f"OK    {name}: {index_name}"))
+            else:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(
+                    f"FAIL  {name}: expected {index_name}, plan used {sorted(used) or 'no index'}"
+                ))
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot quer{'y' if len(failures) == 1 else 'ies'} not using their index.")
@@ -0,0 +1,33 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from users.exporter import EXPORT_DATASETS, EXPORT_FORMATS, encode_chunks, export_chunks
+
+
+class Command(BaseCommand):
+    help = "Streams users or artist works to a CSV or NDJSON file in constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=sorted(EXPORT_DATASETS), help="Table to export.")
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv", help="Output format.")
+        parser.add_argument("--output", default="-", help="Output file ('-' for stdout).")
+        parser.add_argument("--gzip", action="store_true", help="Gzip the output.")
+        parser.add_argument("--batch-size", type=int, default=2000, help="Rows fetched per round trip.")
+
+    def handle(self, *args, **options):
+        chunks = encode_chunks(
+            export_chunks(options["dataset"], options["format"], batch_size=options["batch_size"]),
+            compress=options["gzip"],
+        )
+
+        if options["output"] == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+
+        with open(options["output"], "wb") as output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Exported {options['dataset']} to {options['output']}."))
@@ -0,0 +1,37 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.importer import import_users
+
+
+class Command(BaseCommand):
+    help = "Bulk-imports users from a CSV or NDJSON file using the signup validation rules."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or NDJSON file to import ('-' for stdin).")
+        parser.add_argument("--format", choices=["csv", "ndjson"], help="Input format (default: from file extension).")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per INSERT statement.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"]
+        if fmt is None:
+            extension = os.path.splitext(path)[1].lower()
+            fmt = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}.get(extension)
+            if fmt is None:
+                raise CommandError("Cannot infer the format; pass --format csv or --format ndjson.")
+
+        if path == "-":
+            result = import_users(sys.stdin, fmt, batch_size=options["batch_size"])
+        else:
+            with open(path, newline="", encoding="utf-8") as stream:
+                result = import_users(stream, fmt, batch_size=options["batch_size"])
+
+        for error in result["errors"]:
+            self.stderr.write(f"line {error['line']} ({error['email']}): {error['errors']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['created']} users, {len(result['errors'])} rows rejected."
+        ))
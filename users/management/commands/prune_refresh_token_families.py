@@ -0,0 +1,16 @@
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand
+
+from users.authentication import REFRESH_TOKEN_LIFETIME
+from users.models import UserModel
+
+
+class Command(BaseCommand):
+    help = "Deletes refresh token families whose tokens have all expired. Run it periodically (e.g. daily)."
+
+    def handle(self, *args, **options):
+        # A family's newest token was issued at its last rotation (updated_at)
+        before = datetime.now(timezone.utc) - REFRESH_TOKEN_LIFETIME
+        deleted = UserModel.delete_expired_refresh_token_families(before)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired refresh token families."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users.authentication import revoke_tokens
+
+
+class Command(BaseCommand):
+    help = "Revokes every access and refresh token issued to a user."
+
+    def add_arguments(self, parser):
+        parser.add_argument("user_id", type=int)
+
+    def handle(self, *args, **options):
+        token_version = revoke_tokens(options["user_id"])
+        if token_version is None:
+            raise CommandError(f"User {options['user_id']} not found.")
+        self.stdout.write(self.style.SUCCESS(
+            f"Revoked tokens of user {options['user_id']} (token version {token_version})."
+        ))
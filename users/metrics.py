@@ -0,0 +1,203 @@
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from .db_pool import pool_stats
+from .jwt_utils import verified_token_cache
+from .models import auth_user_cache
+
+# Seconds; spans a cached auth lookup up to a slow password hash or bulk import
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class RequestTimings:
+    """
+    Per-request accumulator for the Server-Timing phases.
+    """
+    __slots__ = ("queries", "db", "phases")
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.phases = {}
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+# Set by the QueryTimingMiddleware for the duration of a request
+current_timings = contextvars.ContextVar("current_timings", default=None)
+
+
+@contextmanager
+def timed(phase):
+    """
+    Adds the time spent in the block to `phase` of the current request, if any.
+    """
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - started)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus sense.
+    """
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+class MetricsRegistry:
+    """
+    Process-local request metrics: per-route histograms of request duration,
+    DB time and query count, a request counter, and collectors that report
+    gauges (cache and pool stats) at scrape time.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}  # (name, labels) -> Histogram
+        self._counters = {}  # (name, labels) -> value
+        self._help = {}  # name -> (type, help)
+        self._collectors = []
+
+    def describe(self, name, kind, help_text):
+        self._help.setdefault(name, (kind, help_text))
+
+    def observe(self, name, labels, value, buckets=DEFAULT_BUCKETS):
+        key = (name, tuple(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name, labels=(), amount=1):
+        key = (name, tuple(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def register_collector(self, collector):
+        """
+        Registers a callable returning (name, type, help, labels, value) samples,
+        called on every scrape.
+        """
+        self._collectors.append(collector)
+        return collector
+
+    def observe_request(self, route, method, status_code, duration, timings):
+        labels = (("route", route), ("method", method))
+        self.inc("http_requests_total", labels + (("status", str(status_code)),))
+        self.observe("http_request_duration_seconds", labels, duration)
+        self.observe("http_request_db_seconds", labels, timings.db)
+        self.observe("http_request_db_queries", labels, timings.queries, QUERY_COUNT_BUCKETS)
+
+    def render(self):
+        """
+        Returns all metrics in the Prometheus text exposition format.
+        """
+        samples = {}  # name -> [lines]
+
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                samples.setdefault(name, []).append(f"{name}{_labels(labels)} {_number(value)}")
+            for (name, labels), histogram in self._histograms.items():
+                lines = samples.setdefault(name, [])
+                for bound, total in histogram.cumulative():
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', _number(bound)),))} {total}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(histogram.sum)}")
+                lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+        for collector in self._collectors:
+            for name, kind, help_text, labels, value in collector():
+                self.describe(name, kind, help_text)
+                samples.setdefault(name, []).append(f"{name}{_labels(labels)} {_number(value)}")
+
+        output = []
+        for name in sorted(samples):
+            kind, help_text = self._help.get(name, ("untyped", ""))
+            output.append(f"# HELP {name} {help_text}")
+            output.append(f"# TYPE {name} {kind}")
+            output.extend(samples[name])
+        return "\n".join(output) + "\n"
+
+
+registry = MetricsRegistry()
+registry.describe("http_requests_total", "counter", "Requests handled, by route, method and status.")
+registry.describe("http_request_duration_seconds", "histogram", "Request duration in seconds.")
+registry.describe("http_request_db_seconds", "histogram", "Time spent executing SQL per request, in seconds.")
+registry.describe("http_request_db_queries", "histogram", "SQL statements executed per request.")
+
+
+def register_cache(prefix, cache, description):
+    """
+    Reports the size and hit/miss/eviction counters of a TTLCache.
+    """
+    def collect():
+        stats = cache.stats()
+        return [
+            (f"{prefix}_size", "gauge", f"Entries in the {description}.", (), stats["size"]),
+            (f"{prefix}_hits_total", "counter", f"{description.capitalize()} hits.", (), stats["hits"]),
+            (f"{prefix}_misses_total", "counter", f"{description.capitalize()} misses.", (), stats["misses"]),
+            (f"{prefix}_evictions_total", "counter", f"{description.capitalize()} LRU evictions.", (), stats["evictions"]),
+        ]
+    return registry.register_collector(collect)
+
+
+register_cache("auth_user_cache", auth_user_cache, "auth user cache")
+register_cache("jwt_verified_cache", verified_token_cache, "verified token cache")
+
+
+@registry.register_collector
+def db_pool_metrics():
+    stats = pool_stats()
+    if stats is None:
+        return []
+    return [
+        ("db_pool_size", "gauge", "Open connections in the pool.", (), stats["size"]),
+        ("db_pool_in_use", "gauge", "Connections checked out of the pool.", (), stats["in_use"]),
+        ("db_pool_waiting", "gauge", "Requests waiting for a connection.", (), stats["waiting"]),
+        ("db_pool_checkouts_total", "counter", "Connections handed out by the pool.", (), stats["checkouts"]),
+        ("db_pool_wait_seconds_total", "counter", "Time spent waiting for a connection.", (), stats["wait_ms_total"] / 1000),
+        ("db_pool_checkout_errors_total", "counter", "Failed connection checkouts.", (), stats["checkout_errors"]),
+    ]
@@ -0,0 +1,91 @@
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.db import connections
+
+from .metrics import RequestTimings, current_timings, registry
+
+
+class QueryTimingMiddleware:
+    """
+    Counts and times every SQL statement run through Django's connections,
+    adds a Server-Timing header (db, auth, serialize and total phases) and
+    records per-route histograms for the /metrics endpoint.
+
+    Queries made by the async views through their own psycopg pool
+    (users/async_models.py) bypass Django's connections and are not counted.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        timings, token, started = self.start(request)
+        try:
+            with self.instrument(timings):
+                response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings, started)
+
+    async def __acall__(self, request):
+        timings, token, started = self.start(request)
+        try:
+            # Django connections are per thread: sync views (and sync_to_async
+            # calls) run on the request's thread-sensitive thread, not this one,
+            # so the wrappers must be installed and removed there
+            stack = await sync_to_async(self.instrument, thread_sensitive=True)(timings)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close, thread_sensitive=True)()
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings, started)
+
+    def start(self, request):
+        timings = RequestTimings()
+        return timings, current_timings.set(timings), time.perf_counter()
+
+    def instrument(self, timings):
+        def wrapper(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                timings.db += time.perf_counter() - started
+                timings.queries += 1
+
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(wrapper))
+        return stack
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered (serialized to JSON) right after this hook
+        timings = current_timings.get()
+        if timings is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(lambda r: timings.add("serialize", time.perf_counter() - started))
+        return response
+
+    def finish(self, request, response, timings, started):
+        duration = time.perf_counter() - started
+
+        entries = [f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} queries"']
+        entries.extend(f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in timings.phases.items())
+        entries.append(f"total;dur={duration * 1000:.2f}")
+        response["Server-Timing"] = ", ".join(entries)
+
+        match = getattr(request, "resolver_match", None)
+        route = match.route if match is not None else "unmatched"  # Bounded label set
+        registry.observe_request(route, request.method, response.status_code, duration, timings)
+        return response
@@ -0,0 +1,65 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Creates the tables accessed through raw SQL in users/models.py.
+    Uses IF NOT EXISTS so databases created before migrations existed
+    can be brought under migration control unchanged.
+    """
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE TABLE IF NOT EXISTS users (
+                    id BIGSERIAL PRIMARY KEY,
+                    first_name VARCHAR(100) NOT NULL,
+                    last_name VARCHAR(100) NOT NULL,
+                    email VARCHAR(254) NOT NULL,
+                    password VARCHAR(128) NOT NULL,
+                    phone VARCHAR(15),
+                    dob DATE,
+                    gender CHAR(1) NOT NULL CHECK (gender IN ('m', 'f', 'o')),
+                    address VARCHAR(255),
+                    role_type VARCHAR(20) NOT NULL
+                        CHECK (role_type IN ('super_admin', 'artist_manager', 'artist')),
+                    is_approved BOOLEAN NOT NULL DEFAULT FALSE,
+                    token_version INTEGER NOT NULL DEFAULT 0,
+                    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+                );
+
+                -- Tables created before token revocation existed
+                ALTER TABLE users ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;
+            """,
+            reverse_sql="DROP TABLE IF EXISTS users;",
+        ),
+        migrations.RunSQL(
+            sql="""
+                CREATE TABLE IF NOT EXISTS approval_requests (
+                    id BIGSERIAL PRIMARY KEY,
+                    user_id BIGINT NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+                    requested_by_id BIGINT REFERENCES users (id) ON DELETE SET NULL,
+                    is_approved BOOLEAN NOT NULL DEFAULT FALSE,
+                    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+                );
+            """,
+            reverse_sql="DROP TABLE IF EXISTS approval_requests;",
+        ),
+        migrations.RunSQL(
+            sql="""
+                CREATE TABLE IF NOT EXISTS artist_works (
+                    id BIGSERIAL PRIMARY KEY,
+                    artist_id BIGINT NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+                    title VARCHAR(255) NOT NULL,
+                    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+                );
+            """,
+            reverse_sql="DROP TABLE IF EXISTS artist_works;",
+        ),
+    ]
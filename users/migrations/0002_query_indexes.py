@@ -0,0 +1,79 @@
+from django.db import IntegrityError, migrations
+
+
+def create_email_index(apps, schema_editor):
+    """
+    A failed CONCURRENTLY build leaves an INVALID index that IF NOT EXISTS
+    would skip, but create_user's ON CONFLICT (email) needs a valid one.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = 'users_email_uniq';
+        """)
+        row = cursor.fetchone()
+        if row is not None and not row[0]:
+            cursor.execute("DROP INDEX CONCURRENTLY users_email_uniq;")
+        try:
+            cursor.execute("CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS users_email_uniq ON users (email);")
+        except IntegrityError as e:
+            cursor.execute("DROP INDEX CONCURRENTLY IF EXISTS users_email_uniq;")
+            raise RuntimeError(
+                "Cannot create users_email_uniq: the users table has duplicate emails. "
+                "Remove the duplicates, then run migrate again."
+            ) from e
+
+
+def drop_email_index(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP INDEX CONCURRENTLY IF EXISTS users_email_uniq;")
+
+
+class Migration(migrations.Migration):
+    """
+    Indexes matching the WHERE/ORDER BY clauses of the raw SQL in
+    users/models.py. Built CONCURRENTLY so existing tables stay writable,
+    which requires running outside a transaction.
+    """
+    atomic = False
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        # get_user_by_email, login and signup duplicate checks
+        migrations.RunPython(create_email_index, drop_email_index),
+        # get_pending_users (keyset on created_at, id) and the per-role dashboard counts
+        migrations.RunSQL(
+            sql="""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS users_role_approved_created_idx
+                ON users (role_type, is_approved, created_at, id);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS users_role_approved_created_idx;",
+        ),
+        # get_token_versions_changed_since, polled by the token revocation list
+        migrations.RunSQL(
+            sql="""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS users_revoked_updated_idx
+                ON users (updated_at) WHERE token_version > 0;
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS users_revoked_updated_idx;",
+        ),
+        # get_pending_approval_requests
+        migrations.RunSQL(
+            sql="""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS approval_requests_pending_idx
+                ON approval_requests (created_at, id) WHERE is_approved = FALSE;
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS approval_requests_pending_idx;",
+        ),
+        # get_artist_works_summary and get_artist_works_page
+        migrations.RunSQL(
+            sql="""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS artist_works_artist_created_idx
+                ON artist_works (artist_id, created_at, id);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS artist_works_artist_created_idx;",
+        ),
+    ]
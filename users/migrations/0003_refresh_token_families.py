@@ -0,0 +1,38 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    One row per login session. Refresh tokens carry the family id and the
+    generation they were issued at; rotation bumps the generation, so a
+    replayed (already rotated) token is detectable without storing tokens.
+    """
+
+    dependencies = [
+        ('users', '0002_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE TABLE IF NOT EXISTS refresh_token_families (
+                    id BIGSERIAL PRIMARY KEY,
+                    user_id BIGINT NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+                    generation INTEGER NOT NULL DEFAULT 0,
+                    revoked_at TIMESTAMP WITH TIME ZONE,
+                    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+                );
+            """,
+            reverse_sql="DROP TABLE IF EXISTS refresh_token_families;",
+        ),
+        # get_refresh_families_revoked_since, polled by the revoked family set.
+        # updated_at is deliberately not indexed so rotations stay HOT updates.
+        migrations.RunSQL(
+            sql="""
+                CREATE INDEX IF NOT EXISTS refresh_token_families_revoked_idx
+                ON refresh_token_families (revoked_at) WHERE revoked_at IS NOT NULL;
+            """,
+            reverse_sql="DROP INDEX IF EXISTS refresh_token_families_revoked_idx;",
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Sequence used as a change counter for users: UserModel bumps it after
+    signups and approvals, and readers compare its last_value to decide
+    whether cached stats and ETags are still current.
+    """
+
+    dependencies = [
+        ('users', '0003_refresh_token_families'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="CREATE SEQUENCE IF NOT EXISTS users_data_version;",
+            reverse_sql="DROP SEQUENCE IF EXISTS users_data_version;",
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Trigram indexes behind UserModel.search_users and search_artist_works.
+    GiST (not GIN) so the ranked ORDER BY distance ... LIMIT is answered by a
+    nearest-neighbour index scan that stops after one page. pg_trgm is a
+    trusted extension on PostgreSQL 13+, so any role with CREATE on the
+    database can install it.
+    """
+    atomic = False
+
+    dependencies = [
+        ('users', '0004_data_version'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="CREATE EXTENSION IF NOT EXISTS pg_trgm;",
+            reverse_sql=migrations.RunSQL.noop,  # Other objects may depend on it
+        ),
+        # Must match USER_SEARCH_TEXT in users/models.py exactly to be used
+        migrations.RunSQL(
+            sql="""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS users_search_trgm_idx
+                ON users USING gist ((first_name || ' ' || last_name || ' ' || email) gist_trgm_ops);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS users_search_trgm_idx;",
+        ),
+        migrations.RunSQL(
+            sql="""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS artist_works_title_trgm_idx
+                ON artist_works USING gist (title gist_trgm_ops);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS artist_works_title_trgm_idx;",
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Shared sliding-window counters for the "postgres" login throttle backend.
+    UNLOGGED: the counts are short-lived and need no WAL or crash safety.
+    """
+
+    dependencies = [
+        ('users', '0005_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE UNLOGGED TABLE IF NOT EXISTS login_throttle (
+                    key VARCHAR(64) NOT NULL,
+                    window_index BIGINT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (key, window_index)
+                );
+            """,
+            reverse_sql="DROP TABLE IF EXISTS login_throttle;",
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Append-only audit trail of signups and approvals, written in batches by
+    the deferred writer (users/deferred.py). No foreign keys or secondary
+    indexes, so the batched inserts stay cheap.
+    """
+
+    dependencies = [
+        ('users', '0006_login_throttle'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE TABLE IF NOT EXISTS audit_events (
+                    id BIGSERIAL PRIMARY KEY,
+                    event VARCHAR(50) NOT NULL,
+                    user_id BIGINT NOT NULL,
+                    actor_id BIGINT,
+                    data JSONB NOT NULL DEFAULT '{}',
+                    created_at TIMESTAMP WITH TIME ZONE NOT NULL
+                );
+            """,
+            reverse_sql="DROP TABLE IF EXISTS audit_events;",
+        ),
+    ]
@@ -1,21 +1,199 @@
-from django.db import connection
-from datetime import datetime
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from datetime import datetime, timezone
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from . import rows
+from .cache import TTLCache
+from .events import publish_on_commit
+
+# Columns needed to authenticate a request; cached per user id.
+AUTH_USER_COLUMNS = "id, email, first_name, last_name, role_type, is_approved, token_version"
+
+# Columns needed to check a login and issue tokens
+LOGIN_USER_COLUMNS = "id, email, password, first_name, last_name, role_type, is_approved, token_version"
+
+# Columns a profile or pending-user listing may select (never the password hash)
+PROFILE_FIELDS = (
+    "id", "first_name", "last_name", "email", "phone", "dob", "gender", "address",
+    "role_type", "is_approved", "created_at", "updated_at",
+)
+PENDING_USER_FIELDS = ("id", "first_name", "last_name", "email", "role_type", "created_at")
+
+auth_user_cache = TTLCache(
+    max_size=getattr(settings, "AUTH_USER_CACHE_MAX_SIZE", 10000),
+    ttl=getattr(settings, "AUTH_USER_CACHE_TTL", 60),
+)
+
+# Postgres sequence bumped after every signup/approval write; it versions the
+# cached dashboard stats and the dashboard/pending-list ETags. A new sequence
+# has last_value 1 before and after the first nextval() (only is_called
+# changes), so is_called is added in to make that first write count too.
+DATA_VERSION_SQL = "SELECT last_value + is_called::int AS version FROM users_data_version;"
+
+# Every role/approval bucket in one scan of users
+USER_STATS_SQL = """
+    SELECT
+        COUNT(*) AS total_users,
+        COUNT(*) FILTER (WHERE role_type = 'super_admin') AS super_admins,
+        COUNT(*) FILTER (WHERE role_type = 'super_admin' AND is_approved = FALSE) AS pending_super_admins,
+        COUNT(*) FILTER (WHERE role_type = 'artist_manager') AS artist_managers,
+        COUNT(*) FILTER (WHERE role_type = 'artist_manager' AND is_approved = FALSE) AS pending_artist_managers,
+        COUNT(*) FILTER (WHERE role_type = 'artist') AS artists,
+        COUNT(*) FILTER (WHERE role_type = 'artist' AND is_approved = TRUE) AS approved_artists,
+        COUNT(*) FILTER (WHERE role_type = 'artist' AND is_approved = FALSE) AS pending_artists
+    FROM users;
+"""
+
+# Text searched by search_users; must match the users_search_trgm_idx expression
+USER_SEARCH_TEXT = "(first_name || ' ' || last_name || ' ' || email)"
+USER_SEARCH_FIELDS = ("id", "first_name", "last_name", "email", "role_type", "is_approved", "created_at")
+
+# Hot queries, kept here so `manage.py check_query_plans` EXPLAINs exactly what runs
+LOGIN_USER_SQL = f"SELECT {LOGIN_USER_COLUMNS} FROM users WHERE email = %s;"
+AUTH_USER_SQL = f"SELECT {AUTH_USER_COLUMNS} FROM users WHERE id = %s;"
+TOKEN_VERSIONS_CHANGED_SQL = """
+    SELECT id, token_version, updated_at
+    FROM users
+    WHERE token_version > 0 AND updated_at > %s;
+"""
+REVOKED_FAMILIES_SQL = """
+    SELECT id, revoked_at
+    FROM refresh_token_families
+    WHERE revoked_at > %s;
+"""
+ARTIST_WORKS_COUNT_SQL = "SELECT COUNT(*) AS total FROM artist_works WHERE artist_id = %s;"
+ARTIST_WORKS_RECENT_SQL = """
+    SELECT title, created_at FROM artist_works WHERE artist_id = %s
+    ORDER BY created_at DESC
+    LIMIT %s;
+"""
+ARTIST_WORKS_PAGE_SQL = """
+    SELECT id, title, created_at FROM artist_works WHERE artist_id = %s
+    ORDER BY created_at DESC, id DESC
+    LIMIT %s OFFSET %s;
+"""
+
+# Replaces a password hash with its upgraded form on login. Conditional on the
+# old hash so a password changed concurrently is never overwritten.
+UPDATE_PASSWORD_HASH_SQL = """
+    UPDATE users SET password = %s, updated_at = CURRENT_TIMESTAMP
+    WHERE id = %s AND password = %s
+    RETURNING id;
+"""
+
+# Columns of audit_events rows, written in batches by the deferred writer
+AUDIT_EVENT_COLUMNS = ("event", "user_id", "actor_id", "data", "created_at")
+
+# Opens a refresh token family at generation 0
+CREATE_REFRESH_FAMILY_SQL = """
+    INSERT INTO refresh_token_families (user_id) VALUES (%s) RETURNING id;
+"""
+
+# Rotates a refresh token family in one statement. If the presented generation
+# is current (and the user is still approved and not revoked), the family moves
+# to the next generation and the user's auth columns are returned with it.
+# A stale generation means an already-rotated token was replayed, so the whole
+# family is revoked instead. A concurrent duplicate of the current token sees
+# neither branch (its snapshot still has the old generation) and is just refused.
+ROTATE_REFRESH_FAMILY_SQL = """
+    WITH rotated AS (
+        UPDATE refresh_token_families f
+        SET generation = f.generation + 1, updated_at = CURRENT_TIMESTAMP
+        FROM users u
+        WHERE f.id = %(family_id)s AND f.user_id = %(user_id)s AND f.generation = %(generation)s
+          AND f.revoked_at IS NULL
+          AND u.id = f.user_id AND u.is_approved = TRUE AND u.token_version <= %(token_version)s
+        RETURNING f.generation, {user_columns}
+    ), reused AS (
+        UPDATE refresh_token_families
+        SET revoked_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+        WHERE id = %(family_id)s AND user_id = %(user_id)s AND generation <> %(generation)s
+          AND revoked_at IS NULL AND NOT EXISTS (SELECT 1 FROM rotated)
+        RETURNING id
+    )
+    SELECT rotated.*, EXISTS (SELECT 1 FROM reused) AS reused
+    FROM (SELECT 1) AS one LEFT JOIN rotated ON TRUE;
+""".format(user_columns=", ".join(f"u.{column.strip()}" for column in AUTH_USER_COLUMNS.split(",")))
 
 class UserModel:
     
     @staticmethod
-    def create_user(first_name, last_name, email, password, phone, dob, gender, address, role_type, is_approved=False):
+    def create_user(first_name, last_name, email, password, phone, dob, gender, address, role_type, is_approved=False,
+                    requested_by_id=None):
         """
-        Creates a new user in the database using raw SQL.
+        Creates a new user in the database using raw SQL, in a single statement.
+        Unapproved users also get an approval request (requested by
+        `requested_by_id`, or by themselves) in the same statement.
+        Returns the new user id, or None if the email is already taken.
         """
         with connection.cursor() as cursor:
             sql = """
-                INSERT INTO users (first_name, last_name, email, password, phone, dob, gender, address, role_type, is_approved, created_at, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                RETURNING id;
+                WITH new_user AS (
+                    INSERT INTO users (first_name, last_name, email, password, phone, dob, gender, address, role_type, is_approved, created_at, updated_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                    ON CONFLICT (email) DO NOTHING
+                    RETURNING id, is_approved
+                ), new_request AS (
+                    INSERT INTO approval_requests (user_id, requested_by_id, is_approved, created_at, updated_at)
+                    SELECT id, COALESCE(%s, id), FALSE, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+                    FROM new_user
+                    WHERE NOT is_approved
+                )
+                SELECT id FROM new_user;
             """
-            cursor.execute(sql, [first_name, last_name, email, password, phone, dob, gender, address, role_type, is_approved])
-            return cursor.fetchone()[0]
+            cursor.execute(sql, [first_name, last_name, email, password, phone, dob, gender, address, role_type, is_approved,
+                                 requested_by_id])
+            result = cursor.fetchone()
+
+        if result is None:
+            return None  # Email already exists
+
+        UserModel.bump_data_version()
+        if not is_approved:
+            publish_on_commit("user_pending", {
+                "user_id": result[0], "email": email, "first_name": first_name, "last_name": last_name,
+                "role_type": role_type,
+            })
+        return result[0]
+
+    @staticmethod
+    def bulk_create_users(users):
+        """
+        Inserts many users with one multi-row INSERT using raw SQL, creating
+        approval requests for the unapproved ones in the same statement.
+        `users` is a list of dicts with the create_user arguments. Rows whose
+        email already exists are skipped. Returns {email: id} for inserted rows.
+        """
+        columns = ["first_name", "last_name", "email", "password", "phone", "dob", "gender", "address", "role_type", "is_approved"]
+        row_sql = "(" + ", ".join(["%s"] * len(columns)) + ", CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+        params = [user.get(column) for user in users for column in columns]
+
+        with connection.cursor() as cursor:
+            sql = f"""
+                WITH new_users AS (
+                    INSERT INTO users ({", ".join(columns)}, created_at, updated_at)
+                    VALUES {", ".join([row_sql] * len(users))}
+                    ON CONFLICT (email) DO NOTHING
+                    RETURNING id, email, is_approved
+                ), new_requests AS (
+                    INSERT INTO approval_requests (user_id, requested_by_id, is_approved, created_at, updated_at)
+                    SELECT id, id, FALSE, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+                    FROM new_users
+                    WHERE NOT is_approved
+                )
+                SELECT id, email FROM new_users;
+            """
+            cursor.execute(sql, params)
+            created = {email: user_id for user_id, email in cursor.fetchall()}
+
+        if created:
+            UserModel.bump_data_version()
+            # One summary event rather than one per row of an import
+            pending = sum(1 for user in users if not user.get("is_approved") and user.get("email") in created)
+            publish_on_commit("users_imported", {"created": len(created), "pending": pending})
+        return created
 
     @staticmethod
     def create_approval_request(user_id, requested_by_id):
@@ -29,7 +207,27 @@ class UserModel:
                 RETURNING id;
             """
             cursor.execute(sql, [user_id, requested_by_id])
-            return cursor.fetchone()[0]
+            request_id = cursor.fetchone()[0]
+
+        publish_on_commit("approval_requested", {
+            "approval_request_id": request_id, "user_id": user_id, "requested_by_id": requested_by_id,
+        })
+        return request_id
+
+    @staticmethod
+    def record_audit_events(event, user_ids, actor_id=None, data=None):
+        """
+        Records an audit event for each user, performed by `actor_id`.
+        The rows are written later in a batch by the deferred writer, off
+        the request path, and only if the current transaction commits.
+        """
+        from .deferred import defer_insert  # deferred -> metrics -> models
+
+        now = datetime.now(timezone.utc)
+        payload = json.dumps(data or {}, cls=DjangoJSONEncoder)
+        defer_insert("audit_events", AUDIT_EVENT_COLUMNS, [
+            (event, user_id, actor_id, payload, now) for user_id in user_ids
+        ])
 
     @staticmethod
     def get_user_by_email(email):
@@ -39,11 +237,7 @@ class UserModel:
         with connection.cursor() as cursor:
             sql = "SELECT * FROM users WHERE email = %s;"
             cursor.execute(sql, [email])
-            row = cursor.fetchone()
-            if row:
-                columns = [col[0] for col in cursor.description]
-                return dict(zip(columns, row))
-            return None
+            return rows.fetchone(cursor)
 
     @staticmethod
     def get_user_by_id(user_id):
@@ -53,96 +247,404 @@ class UserModel:
         with connection.cursor() as cursor:
             sql = "SELECT * FROM users WHERE id = %s;"
             cursor.execute(sql, [user_id])
-            row = cursor.fetchone()
-            if row:
-                columns = [col[0] for col in cursor.description]
-                return dict(zip(columns, row))
-            return None
+            return rows.fetchone(cursor)
+
+    @staticmethod
+    def get_login_user(email):
+        """
+        Retrieves only the columns login needs (including the password hash) by email.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(LOGIN_USER_SQL, [email])
+            return rows.fetchone(cursor)
+
+    @staticmethod
+    def update_password_hash(user_id, new_hash, old_hash):
+        """
+        Stores a rehashed password if the stored hash is still `old_hash`.
+        Returns True if it was updated.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(UPDATE_PASSWORD_HASH_SQL, [new_hash, user_id, old_hash])
+            return cursor.fetchone() is not None
+
+    @staticmethod
+    def get_profile(user_id, fields=None):
+        """
+        Retrieves a user's profile, selecting only the requested PROFILE_FIELDS.
+        """
+        columns = [field for field in PROFILE_FIELDS if fields is None or field in fields] or ["id"]
+        with connection.cursor() as cursor:
+            sql = f"SELECT {', '.join(columns)} FROM users WHERE id = %s;"
+            cursor.execute(sql, [user_id])
+            return rows.fetchone(cursor)
+
+    @staticmethod
+    def get_auth_user(user_id):
+        """
+        Retrieves the auth-relevant fields of a user, served from the
+        process-local auth cache when possible.
+        """
+        user = auth_user_cache.get(user_id)
+        if user is not None:
+            return user
+
+        with connection.cursor() as cursor:
+            cursor.execute(AUTH_USER_SQL, [user_id])
+            user = rows.fetchone(cursor)
+            if user is None:
+                return None
+
+        # Records are immutable, so the cached object can be shared as-is
+        auth_user_cache.set(user_id, user)
+        return user
+
+    @staticmethod
+    def invalidate_auth_user(user_id):
+        """
+        Drops a user from the auth cache. Call after any write that changes
+        a user's profile, role or approval state.
+        """
+        auth_user_cache.invalidate(user_id)
+
+    @staticmethod
+    def revoke_user_tokens(user_id):
+        """
+        Revokes every token issued to a user by bumping their token version.
+        Returns the new token version, or None if the user does not exist.
+        """
+        with connection.cursor() as cursor:
+            sql = """
+                UPDATE users
+                SET token_version = token_version + 1, updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s
+                RETURNING token_version;
+            """
+            cursor.execute(sql, [user_id])
+            result = cursor.fetchone()
+
+        UserModel.invalidate_auth_user(user_id)
+        return result[0] if result else None
+
+    @staticmethod
+    def get_token_versions_changed_since(since):
+        """
+        Returns (id, token_version, updated_at) for users with revoked tokens
+        updated after `since`, used to refresh the token revocation list.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(TOKEN_VERSIONS_CHANGED_SQL, [since])
+            return cursor.fetchall()
+
+    @staticmethod
+    def create_refresh_token_family(user_id):
+        """
+        Starts a refresh token family for a new login session. Returns its id.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(CREATE_REFRESH_FAMILY_SQL, [user_id])
+            return cursor.fetchone()[0]
+
+    @staticmethod
+    def rotate_refresh_token_family(family_id, user_id, generation, token_version):
+        """
+        Rotates a refresh token family (see ROTATE_REFRESH_FAMILY_SQL).
+        Returns a record with the new `generation` (None if refused), the
+        user's auth columns and `reused`, which is True if the family was
+        revoked because an old token was replayed.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(ROTATE_REFRESH_FAMILY_SQL, {
+                "family_id": family_id, "user_id": user_id,
+                "generation": generation, "token_version": token_version,
+            })
+            return rows.fetchone(cursor)
+
+    @staticmethod
+    def get_refresh_families_revoked_since(since):
+        """
+        Returns (id, revoked_at) for refresh token families revoked after
+        `since`, used to refresh the revoked family set.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(REVOKED_FAMILIES_SQL, [since])
+            return cursor.fetchall()
+
+    @staticmethod
+    def delete_expired_refresh_token_families(before):
+        """
+        Deletes families that have not been rotated since `before`; every
+        token they issued has expired. Returns the number of rows deleted.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM refresh_token_families WHERE updated_at < %s;", [before])
+            return cursor.rowcount
 
     @staticmethod
     def approve_user(user_id):
         """
-        Approves a user account using raw SQL.
+        Approves a user account using raw SQL, closing the user's pending
+        approval requests in the same statement.
         """
         with connection.cursor() as cursor:
             sql = """
-                UPDATE users 
-                SET is_approved = TRUE, updated_at = CURRENT_TIMESTAMP 
-                WHERE id = %s AND is_approved = FALSE
-                RETURNING id;
+                WITH approved AS (
+                    UPDATE users 
+                    SET is_approved = TRUE, updated_at = CURRENT_TIMESTAMP 
+                    WHERE id = %s AND is_approved = FALSE
+                    RETURNING id
+                ), closed_requests AS (
+                    UPDATE approval_requests
+                    SET is_approved = TRUE, updated_at = CURRENT_TIMESTAMP
+                    WHERE user_id IN (SELECT id FROM approved) AND is_approved = FALSE
+                )
+                SELECT id FROM approved;
             """
             cursor.execute(sql, [user_id])
             result = cursor.fetchone()
-            return result is not None
+
+        if result is None:
+            return False  # User not found or already approved
+
+        UserModel.invalidate_auth_user(user_id)
+        UserModel.bump_data_version()
+        publish_on_commit("users_approved", {"user_ids": [user_id]})
+        return True
 
     @staticmethod
-    def get_pending_users():
+    def bulk_approve_users(user_ids):
         """
-        Retrieves a list of users with pending approval requests using raw SQL.
+        Approves many users with one set-based UPDATE, also closing their
+        pending approval requests. Returns a list of (user_id, outcome) where
+        outcome is 'approved', 'already_approved' or 'not_found'.
         """
+        user_ids = list(dict.fromkeys(user_ids))
         with connection.cursor() as cursor:
             sql = """
-                SELECT id, first_name, last_name, email, role_type, created_at 
-                FROM users 
-                WHERE is_approved = FALSE AND role_type IN ('super_admin', 'artist_manager')
-                ORDER BY created_at DESC;
+                WITH approved AS (
+                    UPDATE users
+                    SET is_approved = TRUE, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ANY(%s) AND is_approved = FALSE
+                    RETURNING id
+                ), closed_requests AS (
+                    UPDATE approval_requests
+                    SET is_approved = TRUE, updated_at = CURRENT_TIMESTAMP
+                    WHERE user_id IN (SELECT id FROM approved) AND is_approved = FALSE
+                )
+                SELECT r.id,
+                       CASE WHEN a.id IS NOT NULL THEN 'approved'
+                            WHEN u.id IS NOT NULL THEN 'already_approved'
+                            ELSE 'not_found' END
+                FROM unnest(%s::bigint[]) AS r(id)
+                LEFT JOIN approved a ON a.id = r.id
+                LEFT JOIN users u ON u.id = r.id;
             """
-            cursor.execute(sql)
-            columns = [col[0] for col in cursor.description]
-            rows = cursor.fetchall()
-            return [dict(zip(columns, row)) for row in rows] if rows else []
+            cursor.execute(sql, [user_ids, user_ids])
+            outcomes = cursor.fetchall()
+
+        approved = [user_id for user_id, outcome in outcomes if outcome == 'approved']
+        for user_id in approved:
+            UserModel.invalidate_auth_user(user_id)
+        if approved:
+            UserModel.bump_data_version()
+            publish_on_commit("users_approved", {"user_ids": approved})
+        return outcomes
 
     @staticmethod
-    def get_pending_approval_requests():
+    def bulk_approve_approval_requests(request_ids):
         """
-        Retrieves a list of pending approval requests using raw SQL.
+        Approves many approval requests and their users with one statement.
+        Returns a list of (request_id, outcome, user_id) where outcome is
+        'approved', 'already_approved' or 'not_found'.
         """
+        request_ids = list(dict.fromkeys(request_ids))
         with connection.cursor() as cursor:
             sql = """
-                SELECT ar.id, ar.user_id, ar.requested_by_id, ar.created_at, 
-                       u.first_name, u.last_name, u.email, u.role_type
-                FROM approval_requests ar
-                JOIN users u ON ar.user_id = u.id
-                WHERE ar.is_approved = FALSE
-                ORDER BY ar.created_at DESC;
+                WITH approved_requests AS (
+                    UPDATE approval_requests
+                    SET is_approved = TRUE, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ANY(%s) AND is_approved = FALSE
+                    RETURNING id, user_id
+                ), approved_users AS (
+                    UPDATE users
+                    SET is_approved = TRUE, updated_at = CURRENT_TIMESTAMP
+                    WHERE id IN (SELECT user_id FROM approved_requests) AND is_approved = FALSE
+                )
+                SELECT r.id,
+                       CASE WHEN a.id IS NOT NULL THEN 'approved'
+                            WHEN ar.id IS NOT NULL THEN 'already_approved'
+                            ELSE 'not_found' END,
+                       COALESCE(a.user_id, ar.user_id)
+                FROM unnest(%s::bigint[]) AS r(id)
+                LEFT JOIN approved_requests a ON a.id = r.id
+                LEFT JOIN approval_requests ar ON ar.id = r.id;
             """
-            cursor.execute(sql)
-            columns = [col[0] for col in cursor.description]
-            rows = cursor.fetchall()
-            return [dict(zip(columns, row)) for row in rows] if rows else []
+            cursor.execute(sql, [request_ids, request_ids])
+            outcomes = cursor.fetchall()
+
+        approved = [user_id for _, outcome, user_id in outcomes if outcome == 'approved']
+        for user_id in approved:
+            UserModel.invalidate_auth_user(user_id)
+        if approved:
+            UserModel.bump_data_version()
+            publish_on_commit("users_approved", {
+                "user_ids": approved,
+                "approval_request_ids": [request_id for request_id, outcome, _ in outcomes if outcome == 'approved'],
+            })
+        return outcomes
+
+    @staticmethod
+    def pending_users_query(limit=None, after=None, fields=None):
+        """
+        Builds the get_pending_users statement. Returns (sql, params).
+        """
+        columns = [
+            field for field in PENDING_USER_FIELDS
+            if fields is None or field in fields or field in ("id", "created_at")
+        ]
+        sql = f"""
+            SELECT {', '.join(columns)}
+            FROM users 
+            WHERE is_approved = FALSE AND role_type IN ('super_admin', 'artist_manager')
+        """
+        params = []
+        if after is not None:
+            sql += " AND (created_at, id) < (%s, %s)"
+            params.extend(after)
+        sql += " ORDER BY created_at DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT %s"
+            params.append(limit)
+        return sql, params
+
+    @staticmethod
+    def get_pending_users(limit=None, after=None, fields=None):
+        """
+        Retrieves users with pending approval requests using raw SQL, newest first.
+        `after` is a (created_at, id) keyset position; only rows after it are returned.
+        `fields` narrows the selected PENDING_USER_FIELDS (id and created_at are always kept).
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(*UserModel.pending_users_query(limit, after, fields))
+            return rows.fetchall(cursor)
+
+    @staticmethod
+    def pending_approval_requests_query(limit=None, after=None):
+        """
+        Builds the get_pending_approval_requests statement. Returns (sql, params).
+        """
+        sql = """
+            SELECT ar.id, ar.user_id, ar.requested_by_id, ar.created_at, 
+                   u.first_name, u.last_name, u.email, u.role_type
+            FROM approval_requests ar
+            JOIN users u ON ar.user_id = u.id
+            WHERE ar.is_approved = FALSE
+        """
+        params = []
+        if after is not None:
+            sql += " AND (ar.created_at, ar.id) < (%s, %s)"
+            params.extend(after)
+        sql += " ORDER BY ar.created_at DESC, ar.id DESC"
+        if limit is not None:
+            sql += " LIMIT %s"
+            params.append(limit)
+        return sql, params
+
+    @staticmethod
+    def get_pending_approval_requests(limit=None, after=None):
+        """
+        Retrieves pending approval requests using raw SQL, newest first.
+        `after` is a (created_at, id) keyset position of an approval request.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(*UserModel.pending_approval_requests_query(limit, after))
+            return rows.fetchall(cursor)
 
     @staticmethod
     def approve_approval_request(request_id):
         """
         Approves an approval request and updates the user's status using raw SQL.
+        Both updates run in one statement, so they commit or fail together.
         """
         with connection.cursor() as cursor:
-            # Approve the request
             sql = """
-                UPDATE approval_requests 
-                SET is_approved = TRUE, updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s AND is_approved = FALSE
-                RETURNING user_id;
+                WITH approved_request AS (
+                    UPDATE approval_requests 
+                    SET is_approved = TRUE, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = %s AND is_approved = FALSE
+                    RETURNING user_id
+                ), approved_user AS (
+                    UPDATE users 
+                    SET is_approved = TRUE, updated_at = CURRENT_TIMESTAMP
+                    WHERE id IN (SELECT user_id FROM approved_request) AND is_approved = FALSE
+                    RETURNING id
+                )
+                SELECT ar.user_id, au.id IS NOT NULL
+                FROM approved_request ar
+                LEFT JOIN approved_user au ON au.id = ar.user_id;
             """
             cursor.execute(sql, [request_id])
             result = cursor.fetchone()
-            if not result:
-                return False  # Request not found or already approved
 
-            user_id = result[0]
+        if not result:
+            return False  # Request not found or already approved
 
-            # Approve the user
-            sql = """
-                UPDATE users 
-                SET is_approved = TRUE, updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s AND is_approved = FALSE
-                RETURNING id;
-            """
-            cursor.execute(sql, [user_id])
-            return cursor.fetchone() is not None
+        user_id, approved = result
+        UserModel.invalidate_auth_user(user_id)
+        UserModel.bump_data_version()
+        publish_on_commit("users_approved", {
+            "user_ids": [user_id] if approved else [], "approval_request_ids": [request_id],
+        })
+        return approved
             
     # New methods for dashboard functionality
     
+    @staticmethod
+    def get_user_stats(version=None):
+        """
+        Returns every role/approval bucket count from a single scan of users.
+        The result is kept in the shared cache under the current data version
+        (pass `version` if already read), so any signup or approval makes
+        the next call recompute it.
+        """
+        if version is None:
+            version = UserModel.get_data_version()
+        key = f"users:stats:v{version}"
+        stats = cache.get(key)
+        if stats is not None:
+            return stats
+
+        with connection.cursor() as cursor:
+            cursor.execute(USER_STATS_SQL)
+            # Plain dict: the shared cache pickles its values
+            stats = rows.fetchone(cursor)._asdict()
+
+        cache.set(key, stats, getattr(settings, "DASHBOARD_STATS_CACHE_TTL", 30))
+        return stats
+
+    @staticmethod
+    def get_data_version():
+        """
+        Returns the users data version: a counter that grows after every
+        signup or approval, read from a sequence without touching any table.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(DATA_VERSION_SQL)
+            return cursor.fetchone()[0]
+
+    @staticmethod
+    def bump_data_version():
+        """
+        Bumps the users data version once the current transaction commits
+        (right away in autocommit), so a reader never sees the new version
+        with the old data.
+        """
+        def bump():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT nextval('users_data_version');")
+
+        transaction.on_commit(bump)
+
     @staticmethod
     def get_total_users_count():
         """
@@ -179,6 +681,93 @@ class UserModel:
             cursor.execute("SELECT COUNT(*) FROM users WHERE role_type = 'artist' AND is_approved = FALSE;")
             return cursor.fetchone()[0]
 
+    @staticmethod
+    def get_artist_works_summary(artist_id, limit=5):
+        """
+        Returns the total number of works of an artist and the `limit` most
+        recent ones (title and created_at only) using raw SQL.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(ARTIST_WORKS_COUNT_SQL, [artist_id])
+            total = cursor.fetchone()[0]
+            if not total:
+                return 0, []
+
+            cursor.execute(ARTIST_WORKS_RECENT_SQL, [artist_id, limit])
+            return total, rows.fetchall(cursor)
+
+    @staticmethod
+    def get_artist_works_page(artist_id, limit, offset=0):
+        """
+        Returns one page of an artist's works, newest first, using raw SQL.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(ARTIST_WORKS_PAGE_SQL, [artist_id, limit, offset])
+            return rows.fetchall(cursor)
+
+    @staticmethod
+    def search_users_query(query, roles=None, limit=20, after=None):
+        """
+        Builds the search_users statement. Returns (sql, params).
+        """
+        sql = f"""
+            SELECT {', '.join(USER_SEARCH_FIELDS)}, {USER_SEARCH_TEXT} <->> %s AS distance
+            FROM users
+            WHERE {USER_SEARCH_TEXT} %%> %s
+        """
+        params = [query, query]
+        if roles:
+            sql += " AND role_type = ANY(%s)"
+            params.append(list(roles))
+        if after is not None:
+            sql += f" AND ({USER_SEARCH_TEXT} <->> %s, id) > (%s::real, %s)"
+            params.extend([query, *after])
+        sql += " ORDER BY distance, id LIMIT %s"
+        params.append(limit)
+        return sql, params
+
+    @staticmethod
+    def search_users(query, roles=None, limit=20, after=None):
+        """
+        Fuzzy-searches users by name and email, best match first.
+        Each row carries its trigram word-similarity `distance` (0 is an
+        exact word match). `after` is a (distance, id) keyset position.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(*UserModel.search_users_query(query, roles, limit, after))
+            return rows.fetchall(cursor)
+
+    @staticmethod
+    def search_artist_works_query(query, artist_id=None, limit=20, after=None):
+        """
+        Builds the search_artist_works statement. Returns (sql, params).
+        """
+        sql = """
+            SELECT id, artist_id, title, created_at, title <->> %s AS distance
+            FROM artist_works
+            WHERE title %%> %s
+        """
+        params = [query, query]
+        if artist_id is not None:
+            sql += " AND artist_id = %s"
+            params.append(artist_id)
+        if after is not None:
+            sql += " AND (title <->> %s, id) > (%s::real, %s)"
+            params.extend([query, *after])
+        sql += " ORDER BY distance, id LIMIT %s"
+        params.append(limit)
+        return sql, params
+
+    @staticmethod
+    def search_artist_works(query, artist_id=None, limit=20, after=None):
+        """
+        Fuzzy-searches artist works by title, best match first, optionally
+        within one artist's works. Paginates like search_users.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(*UserModel.search_artist_works_query(query, artist_id, limit, after))
+            return rows.fetchall(cursor)
+
     @staticmethod
     def get_artist_works(artist_id):
         """
@@ -190,6 +779,4 @@ class UserModel:
                 SELECT * FROM artist_works WHERE artist_id = %s 
                 ORDER BY created_at DESC;
             """, [artist_id])
-            columns = [col[0] for col in cursor.description]
-            rows = cursor.fetchall()
-            return [dict(zip(columns, row)) for row in rows] if rows else []
\ No newline at end of file
+            return rows.fetchall(cursor)
\ No newline at end of file
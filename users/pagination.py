@@ -0,0 +1,68 @@
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(created_at, row_id):
+    """
+    Encodes a (created_at, id) keyset position as an opaque URL-safe string.
+    """
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decodes a cursor produced by encode_cursor back into (created_at, id).
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_page(rows, page_size, id_key="id"):
+    """
+    Splits rows fetched with LIMIT page_size + 1 into the page and the cursor
+    of the next page (None when this is the last page).
+    """
+    page = rows[:page_size]
+    if len(rows) <= page_size:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(last["created_at"], last[id_key])
+
+
+def encode_search_cursor(distance, row_id):
+    """
+    Encodes a ranked-search (distance, id) keyset position.
+    """
+    raw = json.dumps([distance, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor):
+    """
+    Decodes a cursor produced by encode_search_cursor back into (distance, id).
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        distance, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(distance), int(row_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def search_page(rows, page_size):
+    """
+    Like keyset_page, for rows ordered by (distance, id).
+    """
+    page = rows[:page_size]
+    if len(rows) <= page_size:
+        return page, None
+    last = page[-1]
+    return page, encode_search_cursor(last["distance"], last["id"])
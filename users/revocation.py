@@ -0,0 +1,144 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.db import DatabaseError
+
+from .models import UserModel
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalRevocations:
+    """
+    Base for in-memory revocation state that is refreshed incrementally
+    from the database at most once every `refresh_interval` seconds.
+
+    A revocation older than `lifetime` can no longer affect any unexpired
+    token, so entries are pruned after that and the state stays small.
+    Subclasses implement fetch(since), apply(changes) and prune(cutoff).
+    """
+    # Overlap between refresh windows so no write slips between two reads
+    CLOCK_SKEW = timedelta(seconds=5)
+
+    def __init__(self, lifetime, refresh_interval=30):
+        self.lifetime = lifetime
+        self.refresh_interval = refresh_interval
+        self._since = None
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def refresh_due(self):
+        return time.monotonic() >= self._next_refresh
+
+    def refresh(self):
+        """
+        Pulls revocations made since the last refresh from the database.
+        """
+        # Only one thread refreshes; the others keep using the current state
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            now = datetime.now(timezone.utc)
+            cutoff = now - self.lifetime
+            since = cutoff if self._since is None else max(self._since - self.CLOCK_SKEW, cutoff)
+
+            try:
+                changes = self.fetch(since)
+            except DatabaseError:
+                # Keep serving the last known state; retry on the next interval
+                logger.warning("%s refresh failed", type(self).__name__, exc_info=True)
+                self._next_refresh = time.monotonic() + self.refresh_interval
+                return
+
+            self.apply(changes)
+            self.prune(cutoff)
+            self._since = now
+            self._next_refresh = time.monotonic() + self.refresh_interval
+        finally:
+            self._lock.release()
+
+    def fetch(self, since):
+        raise NotImplementedError
+
+    def apply(self, changes):
+        raise NotImplementedError
+
+    def prune(self, cutoff):
+        raise NotImplementedError
+
+
+class TokenRevocationList(IncrementalRevocations):
+    """
+    In-memory map of user id -> current token version for users whose
+    tokens were revoked within the access token lifetime.
+    """
+    def __init__(self, lifetime, refresh_interval=30):
+        super().__init__(lifetime, refresh_interval)
+        self._versions = {}  # user_id -> (token_version, changed_at)
+
+    def is_revoked(self, user_id, token_version):
+        """
+        Returns True if tokens of `token_version` have been revoked for the user.
+        """
+        if self.refresh_due():
+            self.refresh()
+        entry = self._versions.get(user_id)
+        return entry is not None and entry[0] > token_version
+
+    def mark_revoked(self, user_id, token_version):
+        """
+        Records a revocation made by this process without waiting for a refresh.
+        """
+        with self._lock:
+            self._versions[user_id] = (token_version, datetime.now(timezone.utc))
+
+    def fetch(self, since):
+        return UserModel.get_token_versions_changed_since(since)
+
+    def apply(self, changes):
+        for user_id, token_version, changed_at in changes:
+            current = self._versions.get(user_id)
+            if current is None or current[0] < token_version:
+                self._versions[user_id] = (token_version, changed_at)
+
+    def prune(self, cutoff):
+        self._versions = {
+            user_id: entry for user_id, entry in self._versions.items() if entry[1] >= cutoff
+        }
+
+
+class RevokedTokenFamilies(IncrementalRevocations):
+    """
+    In-memory set of refresh token families revoked within the refresh
+    token lifetime (after reuse was detected), so tokens of a revoked
+    family are refused without a database hit.
+    """
+    def __init__(self, lifetime, refresh_interval=30):
+        super().__init__(lifetime, refresh_interval)
+        self._revoked = {}  # family_id -> revoked_at
+
+    def is_revoked(self, family_id):
+        if self.refresh_due():
+            self.refresh()
+        return family_id in self._revoked
+
+    def mark_revoked(self, family_id):
+        """
+        Records a revocation made by this process without waiting for a refresh.
+        """
+        with self._lock:
+            self._revoked[family_id] = datetime.now(timezone.utc)
+
+    def fetch(self, since):
+        return UserModel.get_refresh_families_revoked_since(since)
+
+    def apply(self, changes):
+        for family_id, revoked_at in changes:
+            self._revoked[family_id] = revoked_at
+
+    def prune(self, cutoff):
+        self._revoked = {
+            family_id: revoked_at for family_id, revoked_at in self._revoked.items() if revoked_at >= cutoff
+        }
@@ -0,0 +1,73 @@
+from collections import namedtuple
+from functools import lru_cache
+
+
+class RecordMixin:
+    """
+    Lets a namedtuple row be read like the dicts UserModel used to return:
+    row["email"], row.get("phone"), row.keys() and **row all work.
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self._fields else default
+
+    def keys(self):
+        return self._fields
+
+
+@lru_cache(maxsize=256)
+def record_type(columns):
+    """
+    Returns the (cached) slotted record class for a tuple of column names.
+    """
+    base = namedtuple("Record", columns)
+    return type("Record", (RecordMixin, base), {"__slots__": ()})
+
+
+def layout(cursor):
+    """
+    Returns the record class matching the columns of the cursor's last query.
+    """
+    return record_type(tuple(col[0] for col in cursor.description))
+
+
+def fetchone(cursor):
+    """
+    Fetches one row as a record, or None.
+    """
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return layout(cursor)._make(row)
+
+
+def fetchall(cursor):
+    """
+    Fetches all remaining rows as records sharing one cached layout.
+    """
+    rows = cursor.fetchall()
+    if not rows:
+        return []
+    make = layout(cursor)._make
+    return [make(row) for row in rows]
+
+
+def record_row_factory(cursor):
+    """
+    psycopg 3 row factory producing the same records as fetchone/fetchall.
+    """
+    if cursor.description is None:
+        return tuple
+    return layout(cursor)._make
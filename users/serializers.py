@@ -1,5 +1,31 @@
 from rest_framework import serializers
 from .models import UserModel
+from .pagination import decode_cursor, decode_search_cursor
+
+def parse_fields(value, allowed):
+    """
+    Parses a `?fields=a,b` sparse-fieldset parameter into a tuple of field
+    names (in `allowed` order). Returns None when no fields were requested.
+    """
+    if not value:
+        return None
+    requested = {field.strip() for field in value.split(",") if field.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise serializers.ValidationError({"fields": [f"Unknown field(s): {', '.join(sorted(unknown))}"]})
+    return tuple(field for field in allowed if field in requested)
+
+
+class SparseFieldsMixin:
+    """
+    Accepts a `fields` argument and drops every other field from the output.
+    """
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
 
 class UserSignupSerializer(serializers.Serializer):
     first_name = serializers.CharField(max_length=100)
@@ -13,16 +39,15 @@ class UserSignupSerializer(serializers.Serializer):
     address = serializers.CharField(max_length=255, required=False)
     role_type = serializers.ChoiceField(choices=['super_admin', 'artist_manager', 'artist'])
     
+    # Duplicate emails are rejected by the insert itself (ON CONFLICT on the
+    # unique email index), which also closes the race between two signups.
+    EMAIL_EXISTS_ERROR = {"email": ["User with this email already exists"]}
+
     def validate(self, data):
         # Check if passwords match
         if data['password'] != data['confirm_password']:
             raise serializers.ValidationError({"confirm_password": "Passwords don't match"})
             
-        # Check if email already exists
-        user = UserModel.get_user_by_email(data['email'])
-        if user:
-            raise serializers.ValidationError({"email": "User with this email already exists"})
-            
         return data
 
     def create(self, validated_data):
@@ -32,34 +57,57 @@ class UserSignupSerializer(serializers.Serializer):
         # Remove confirm_password from the data
         validated_data.pop('confirm_password')
         
-        # Create the user
-        user_id = UserModel.create_user(**validated_data)
-        
-        # If the role is super_admin or artist_manager, create an approval request
-        if validated_data['role_type'] in ['super_admin', 'artist_manager']:
-            requested_by_id = self.context['request'].user.id  # Assuming the request is made by an authenticated user
-            UserModel.create_approval_request(user_id, requested_by_id)
+        # Create the user; super_admins and artist_managers get their approval
+        # request in the same statement
+        requested_by_id = self.context['request'].user.id  # Assuming the request is made by an authenticated user
+        user_id = UserModel.create_user(
+            first_name=validated_data['first_name'],
+            last_name=validated_data['last_name'],
+            email=validated_data['email'],
+            password=validated_data['password'],
+            phone=validated_data.get('phone'),
+            dob=validated_data.get('dob'),
+            gender=validated_data['gender'],
+            address=validated_data.get('address'),
+            role_type=validated_data['role_type'],
+            is_approved=validated_data['role_type'] == 'artist',
+            requested_by_id=requested_by_id,
+        )
+        if user_id is None:
+            raise serializers.ValidationError(self.EMAIL_EXISTS_ERROR)
         
         return {"user_id": user_id}
 
 
+class UserImportSerializer(UserSignupSerializer):
+    """
+    Signup rules for bulk-imported rows, with confirm_password optional.
+    """
+    confirm_password = serializers.CharField(write_only=True, required=False)
+
+    def validate(self, data):
+        if 'confirm_password' in data and data['password'] != data['confirm_password']:
+            raise serializers.ValidationError({"confirm_password": "Passwords don't match"})
+        return data
+
+
 class UserLoginSerializer(serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField()
 
 
+class TokenRevocationSerializer(serializers.Serializer):
+    user_id = serializers.IntegerField()
+
+
 class UserApprovalSerializer(serializers.Serializer):
-    approver_id = serializers.IntegerField()
+    # Ignored: the authenticated super_admin is the approver. Accepted for older clients.
+    approver_id = serializers.IntegerField(required=False)
     user_id = serializers.IntegerField()
 
     def validate(self, data):
-        # Check if the approver is a super_admin
-        approver = UserModel.get_user_by_id(data['approver_id'])
-        if not approver or approver['role_type'] != 'super_admin':
-            raise serializers.ValidationError({"approver_id": "Only super_admin can approve users"})
-        
         # Check if the user exists and is pending approval
-        user = UserModel.get_user_by_id(data['user_id'])
+        user = UserModel.get_auth_user(data['user_id'])
         if not user or user['is_approved']:
             raise serializers.ValidationError({"user_id": "User not found or already approved"})
         
@@ -70,7 +118,7 @@ class UserApprovalSerializer(serializers.Serializer):
         Approves a user and their approval request.
         """
         user_id = validated_data['user_id']
-        approver_id = validated_data['approver_id']
+        approver_id = self.context['request'].user.id
         
         # Approve the user
         UserModel.approve_user(user_id)
@@ -78,10 +126,109 @@ class UserApprovalSerializer(serializers.Serializer):
         return {"user_id": user_id, "approved_by": approver_id}
 
 
-class PendingUsersSerializer(serializers.Serializer):
+class BulkApprovalSerializer(serializers.Serializer):
+    user_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, allow_empty=False, max_length=1000
+    )
+    approval_request_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, allow_empty=False, max_length=1000
+    )
+
+    def validate(self, data):
+        # Exactly one kind of id list per request
+        if ('user_ids' in data) == ('approval_request_ids' in data):
+            raise serializers.ValidationError("Provide either user_ids or approval_request_ids.")
+        return data
+
+
+class PendingUsersSerializer(SparseFieldsMixin, serializers.Serializer):
+    id = serializers.IntegerField()
+    first_name = serializers.CharField()
+    last_name = serializers.CharField()
+    email = serializers.EmailField()
+    role_type = serializers.CharField()
+    created_at = serializers.DateTimeField()
+
+
+class UserProfileSerializer(SparseFieldsMixin, serializers.Serializer):
+    id = serializers.IntegerField()
+    first_name = serializers.CharField()
+    last_name = serializers.CharField()
+    email = serializers.EmailField()
+    phone = serializers.CharField(allow_null=True)
+    dob = serializers.DateField(allow_null=True)
+    gender = serializers.CharField()
+    address = serializers.CharField(allow_null=True)
+    role_type = serializers.CharField()
+    is_approved = serializers.BooleanField()
+    created_at = serializers.DateTimeField()
+    updated_at = serializers.DateTimeField()
+
+
+class ArtistWorkSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    created_at = serializers.DateTimeField()
+
+
+class PaginationSerializer(serializers.Serializer):
+    page = serializers.IntegerField(min_value=1, default=1)
+    page_size = serializers.IntegerField(min_value=1, max_value=100, required=False)
+
+
+class CursorPaginationSerializer(serializers.Serializer):
+    cursor = serializers.CharField(required=False)
+    page_size = serializers.IntegerField(min_value=1, max_value=200, required=False)
+
+    def validate_cursor(self, value):
+        try:
+            return decode_cursor(value)
+        except ValueError:
+            raise serializers.ValidationError("Invalid cursor")
+
+
+class SearchSerializer(serializers.Serializer):
+    q = serializers.CharField(min_length=3, max_length=100, trim_whitespace=True)
+    cursor = serializers.CharField(required=False)
+    page_size = serializers.IntegerField(min_value=1, max_value=100, required=False)
+
+    def validate_cursor(self, value):
+        try:
+            return decode_search_cursor(value)
+        except ValueError:
+            raise serializers.ValidationError("Invalid cursor")
+
+
+class UserSearchSerializer(SearchSerializer):
+    role = serializers.ListField(
+        child=serializers.ChoiceField(choices=["super_admin", "artist_manager", "artist"]), required=False
+    )
+
+
+class WorkSearchSerializer(SearchSerializer):
+    artist_id = serializers.IntegerField(min_value=1, required=False)
+
+
+class UserSearchResultSerializer(serializers.Serializer):
     id = serializers.IntegerField()
     first_name = serializers.CharField()
     last_name = serializers.CharField()
     email = serializers.EmailField()
     role_type = serializers.CharField()
-    created_at = serializers.DateTimeField()
\ No newline at end of file
+    is_approved = serializers.BooleanField()
+    created_at = serializers.DateTimeField()
+    score = serializers.SerializerMethodField()
+
+    def get_score(self, row):
+        return round(1 - row["distance"], 4)
+
+
+class WorkSearchResultSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    artist_id = serializers.IntegerField()
+    title = serializers.CharField()
+    created_at = serializers.DateTimeField()
+    score = serializers.SerializerMethodField()
+
+    def get_score(self, row):
+        return round(1 - row["distance"], 4)
@@ -1,3 +1,854 @@
-from django.test import TestCase
+import asyncio
+import csv
+import datetime
+import gzip
+import json
+import re
+import threading
+import time
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import jwt
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.http import JsonResponse
+from django.test import AsyncClient, Client, SimpleTestCase, TestCase, override_settings
+from django.urls import path
+from psycopg.conninfo import conninfo_to_dict
+from rest_framework import exceptions, serializers
+
+from users.async_models import _conninfo
+from users.authentication import JWTAuthentication, JWTHandler, REFRESH_TOKEN_LIFETIME, SECRET_KEY
+from users.cache import TTLCache
+from users.deferred import DeferredWriter
+from users.events import (
+    MAX_EVENT_IDS, MAX_NOTIFY_PAYLOAD, RESYNC, Event, LocalBroker, PostgresBroker, Subscription, cap_ids,
+)
+from users.exporter import encode_chunks, export_chunks
+from users.management.commands.check_query_plans import hot_queries
+from users.models import PENDING_USER_FIELDS, PROFILE_FIELDS, UserModel
+from users.pagination import (
+    decode_cursor, decode_search_cursor, encode_cursor, encode_search_cursor, keyset_page, search_page,
+)
+from users.revocation import RevokedTokenFamilies, TokenRevocationList
+from users.rows import fetchall, fetchone, record_row_factory, record_type
+from users.serializers import PendingUsersSerializer, UserSignupSerializer, parse_fields
+from users.throttling import LoginThrottle, MemoryWindowStore, PostgresWindowStore
+from users.views.imports import count_lines
+
+
+def one_query_view(request):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1;")
+    return JsonResponse({})
+
+
+urlpatterns = [
+    path("one-query", one_query_view),
+]
+
+
+def create_user(email, role_type="artist", is_approved=True):
+    return UserModel.create_user(
+        first_name="Test", last_name="User", email=email, password="unusable", phone=None, dob=None,
+        gender="o", address=None, role_type=role_type, is_approved=is_approved,
+    )
+
+
+def bearer(token):
+    return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class QueryTimingMiddlewareTests(TestCase):
+    def assert_counted(self, response):
+        self.assertIn('desc="1 queries"', response["Server-Timing"])
+
+    def test_sync_view_queries_counted_under_wsgi(self):
+        self.assert_counted(Client().get("/one-query"))
+
+    async def test_sync_view_queries_counted_under_asgi(self):
+        self.assert_counted(await AsyncClient().get("/one-query"))
+
+
+@override_settings(JWT_STATELESS_AUTH=True)
+class ServerTimingTests(TestCase):
+    entry = re.compile(r'^(?P<name>[a-z]+);dur=(?P<dur>\d+\.\d{2})(;desc="[^"]*")?$')
+
+    def test_header_well_formed(self):
+        token, _ = JWTHandler.generate_tokens(1, {"role_type": "super_admin", "is_approved": True, "token_version": 0})
+        with mock.patch.object(UserModel, "search_users", return_value=[]):
+            response = self.client.get("/api/users/search/users/?q=ada", **bearer(token))
+        self.assertEqual(response.status_code, 200)
+
+        entries = [self.entry.match(entry) for entry in response["Server-Timing"].split(", ")]
+        self.assertTrue(all(entries), response["Server-Timing"])
+        names = [match["name"] for match in entries]
+        self.assertEqual((names[0], names[-1]), ("db", "total"))
+        self.assertIn("auth", names)
+        self.assertIn("serialize", names)
+        self.assertEqual(len(names), len(set(names)))
+        durations = {match["name"]: float(match["dur"]) for match in entries}
+        self.assertGreaterEqual(durations["total"], durations["auth"])
+
+
+@override_settings(JWT_STATELESS_AUTH=True)
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        self.user_id = create_user("revoked@example.com")
+        self.access_token, _ = JWTHandler.generate_tokens(self.user_id, {
+            "role_type": "artist", "is_approved": True, "token_version": 0,
+        })
+
+    def profile(self):
+        return self.client.get("/api/users/auth/me/", **bearer(self.access_token))
+
+    def test_stateless_token_refused_after_revoke_endpoint(self):
+        admin_id = create_user("admin@example.com", role_type="super_admin")
+        admin_token, _ = JWTHandler.generate_tokens(admin_id, {
+            "role_type": "super_admin", "is_approved": True, "token_version": 0,
+        })
+        self.assertEqual(self.profile().status_code, 200)
+
+        response = self.client.post("/api/users/admin/revoke-tokens/", {"user_id": self.user_id},
+                                    content_type="application/json", **bearer(admin_token))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["token_version"], 1)
+        self.assertEqual(self.profile().status_code, 401)
+
+    def test_stateless_token_refused_after_revoke_command(self):
+        self.assertEqual(self.profile().status_code, 200)
+        call_command("revoke_tokens", str(self.user_id), stdout=StringIO())
+        self.assertEqual(self.profile().status_code, 401)
+
+    def test_revoke_endpoint_requires_super_admin(self):
+        response = self.client.post("/api/users/admin/revoke-tokens/", {"user_id": self.user_id},
+                                    content_type="application/json", **bearer(self.access_token))
+        self.assertEqual(response.status_code, 403)
+
+
+class ApproveUserViewTests(TestCase):
+    url = "/api/users/admin/approve-user/"
+
+    def test_anonymous_caller_refused(self):
+        response = self.client.post(self.url, {"approver_id": 1, "user_id": 2}, content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(JWT_STATELESS_AUTH=True)
+    def test_non_super_admin_refused(self):
+        token, _ = JWTHandler.generate_tokens(1, {"role_type": "artist_manager", "is_approved": True, "token_version": 0})
+        response = self.client.post(self.url, {"user_id": 2}, content_type="application/json", **bearer(token))
+        self.assertEqual(response.status_code, 403)
+
+    def test_audit_actor_is_authenticated_user(self):
+        admin_id = create_user("approver@example.com", role_type="super_admin")
+        other_admin_id = create_user("other-admin@example.com", role_type="super_admin")
+        pending_id = create_user("pending@example.com", role_type="artist_manager", is_approved=False)
+        token, _ = JWTHandler.generate_tokens(admin_id, {
+            "role_type": "super_admin", "is_approved": True, "token_version": 0,
+        })
+
+        with mock.patch.object(UserModel, "record_audit_events") as record:
+            response = self.client.post(self.url, {"approver_id": other_admin_id, "user_id": pending_id},
+                                        content_type="application/json", **bearer(token))
+
+        self.assertEqual(response.status_code, 200)
+        record.assert_called_once_with("user_approved", [pending_id], actor_id=admin_id)
+
+
+@override_settings(JWT_STATELESS_AUTH=True)
+class BulkApproveUsersViewTests(TestCase):
+    url = "/api/users/admin/bulk-approve/"
+
+    def test_non_super_admin_refused(self):
+        for role_type in ("artist_manager", "artist"):
+            token, _ = JWTHandler.generate_tokens(1, {"role_type": role_type, "is_approved": True, "token_version": 0})
+            with mock.patch.object(UserModel, "bulk_approve_users") as bulk_approve:
+                response = self.client.post(self.url, {"user_ids": [2, 3]}, content_type="application/json",
+                                            **bearer(token))
+            self.assertEqual(response.status_code, 403)
+            bulk_approve.assert_not_called()
+
+    def test_anonymous_caller_refused(self):
+        response = self.client.post(self.url, {"user_ids": [2]}, content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+
+
+@mock.patch("users.views.auth.hash_password", return_value="unusable")
+class SignupViewTests(TestCase):
+    url = "/api/users/auth/signup/"
+
+    def signup(self, email, role_type="artist"):
+        return self.client.post(self.url, {
+            "first_name": "Test", "last_name": "User", "email": email, "password": "pw", "confirm_password": "pw",
+            "gender": "o", "role_type": role_type,
+        }, content_type="application/json")
+
+    def test_duplicate_email_refused(self, hash_password):
+        self.assertEqual(self.signup("taken@example.com").status_code, 201)
+        response = self.signup("taken@example.com", role_type="artist_manager")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), UserSignupSerializer.EMAIL_EXISTS_ERROR)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM approval_requests;")
+            self.assertEqual(cursor.fetchone()[0], 0)  # No request for the rejected pending signup
+
+    def test_unapproved_signup_creates_one_approval_request(self, hash_password):
+        response = self.signup("manager@example.com", role_type="artist_manager")
+        self.assertEqual(response.status_code, 201)
+        user_id = response.json()["user_id"]
+        self.assertFalse(response.json()["is_approved"])
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT user_id, requested_by_id, is_approved FROM approval_requests;")
+            self.assertEqual(cursor.fetchall(), [(user_id, user_id, False)])
+
+
+class ConninfoTests(SimpleTestCase):
+    def test_values_quoted_and_options_passed(self):
+        database = {
+            "NAME": "app", "USER": "app", "PASSWORD": "pass word'", "HOST": "db", "PORT": "",
+            "OPTIONS": {"sslmode": "require", "pool": {"max_size": 4}},
+        }
+        with override_settings(DATABASES={"default": database}):
+            params = conninfo_to_dict(_conninfo())
+
+        self.assertEqual(params, {
+            "dbname": "app", "user": "app", "password": "pass word'", "host": "db", "sslmode": "require",
+        })
+
+
+class EventPayloadTests(SimpleTestCase):
+    def test_long_id_lists_capped(self):
+        data = cap_ids({"user_ids": list(range(1000)), "approval_request_ids": [1, 2]})
+        self.assertEqual(data["user_ids"], list(range(MAX_EVENT_IDS)))
+        self.assertEqual(data["user_ids_total"], 1000)
+        self.assertEqual(data["approval_request_ids"], [1, 2])
+        self.assertTrue(data["truncated"])
+        self.assertNotIn("truncated", cap_ids({"user_ids": [1]}))
+
+    def test_oversized_notify_sends_resync(self):
+        cursor = mock.MagicMock()
+        with mock.patch("users.events.connection") as connection_:
+            connection_.cursor.return_value.__enter__.return_value = cursor
+            PostgresBroker().publish("users_imported", {"note": "x" * MAX_NOTIFY_PAYLOAD})
+
+        channel, payload = cursor.execute.call_args[0][1]
+        self.assertEqual(json.loads(payload), {"name": "resync", "data": {}})
+
+
+class EventDeliveryTests(SimpleTestCase):
+    async def test_overflow_collapses_to_resync(self):
+        subscription = Subscription(asyncio.get_running_loop(), max_queue=2)
+        for event_id in (1, 2, 3):
+            subscription.deliver(Event(event_id, "user_approved", {}))
+
+        self.assertEqual(subscription.get_nowait(), RESYNC)
+        self.assertIsNone(subscription.get_nowait())
+        subscription.deliver(Event(4, "user_approved", {}))
+        self.assertEqual(subscription.get_nowait().id, 4)
+
+    async def test_dispatch_reaches_only_given_loop(self):
+        broker = LocalBroker()
+        here = broker.subscribe()
+        other_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=other_loop.run_forever)
+        thread.start()
+        try:
+            async def subscribe():
+                return broker.subscribe()
+
+            async def drain(subscription):
+                return subscription.get_nowait()
+
+            def on_other_loop(coroutine):
+                return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, other_loop))
+
+            there = await on_other_loop(subscribe())
+            broker.dispatch("user_approved", {"user_ids": [1]}, loop=asyncio.get_running_loop())
+            event = await asyncio.wait_for(here.get(), 1)
+            self.assertEqual((event.name, event.data), ("user_approved", {"user_ids": [1]}))
+            self.assertIsNone(await on_other_loop(drain(there)))
+
+            broker.dispatch("users_imported", {})
+            self.assertEqual((await asyncio.wait_for(here.get(), 1)).name, "users_imported")
+            self.assertEqual((await on_other_loop(drain(there))).name, "users_imported")
+        finally:
+            other_loop.call_soon_threadsafe(other_loop.stop)
+            thread.join()
+            other_loop.close()
+
+
+class TokenTypeTests(SimpleTestCase):
+    def legacy_token(self, lifetime, **claims):
+        exp = datetime.datetime.now(datetime.timezone.utc) + lifetime
+        return jwt.encode({"user_id": 1, "exp": exp, **claims}, SECRET_KEY, algorithm="HS256")
+
+    def test_new_tokens_typed(self):
+        access_token, refresh_token = JWTHandler.generate_tokens(1)
+        self.assertEqual(JWTHandler.decode_token(access_token)["typ"], "access")
+        self.assertEqual(JWTHandler.decode_token(refresh_token)["typ"], "refresh")
+
+    def test_refresh_token_refused_as_access_token(self):
+        _, refresh_token = JWTHandler.generate_tokens(1)
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            JWTAuthentication().get_payload(refresh_token)
+
+    def test_legacy_refresh_token_refused_as_access_token(self):
+        token = self.legacy_token(REFRESH_TOKEN_LIFETIME)
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            JWTAuthentication().get_payload(token)
+
+    def test_legacy_access_token_accepted(self):
+        token = self.legacy_token(datetime.timedelta(minutes=10))
+        self.assertEqual(JWTAuthentication().get_payload(token)["user_id"], 1)
+
+
+class StubRevocationList(TokenRevocationList):
+    def __init__(self, changes):
+        super().__init__(lifetime=datetime.timedelta(minutes=30), refresh_interval=30)
+        self.changes = changes
+        self.fetched_since = []
+
+    def fetch(self, since):
+        self.fetched_since.append(since)
+        if isinstance(self.changes, Exception):
+            raise self.changes
+        return self.changes
+
+
+class IncrementalRevocationsTests(SimpleTestCase):
+    def test_refresh_applies_newer_versions(self):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        revocations = StubRevocationList([(1, 2, now), (2, 1, now)])
+        self.assertTrue(revocations.is_revoked(1, 1))
+        self.assertFalse(revocations.is_revoked(1, 2))
+        self.assertFalse(revocations.is_revoked(3, 0))
+
+        # A stale row from an overlapping window never lowers a version
+        revocations.changes = [(1, 1, now)]
+        revocations._next_refresh = 0
+        self.assertTrue(revocations.is_revoked(1, 1))
+
+    def test_refresh_windows_overlap(self):
+        revocations = StubRevocationList([])
+        revocations.refresh()
+        revocations.refresh()
+        first, second = revocations.fetched_since
+        self.assertLess(second, revocations._since)
+        self.assertGreater(second, first)
+
+    def test_entries_pruned_after_lifetime(self):
+        old = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=1)
+        revocations = StubRevocationList([(1, 2, old)])
+        revocations.refresh()
+        self.assertFalse(revocations.is_revoked(1, 1))
+
+    def test_failed_refresh_keeps_state(self):
+        revocations = StubRevocationList([])
+        revocations.mark_revoked(1, 2)
+        revocations.changes = DatabaseError("down")
+        with self.assertLogs("users.revocation", "WARNING"):
+            revocations.refresh()
+        self.assertTrue(revocations.is_revoked(1, 1))
+        self.assertFalse(revocations.refresh_due())
+
+
+class RefreshTokenFamilyTests(TestCase):
+    url = "/api/users/auth/refresh-token/"
+
+    def setUp(self):
+        self.user = {"role_type": "artist", "is_approved": True, "token_version": 0}
+        self.user_id = create_user("family@example.com")
+        self.family_id = UserModel.create_refresh_token_family(self.user_id)
+        self.access_token, self.refresh_token = JWTHandler.generate_tokens(
+            self.user_id, self.user, family=(self.family_id, 0)
+        )
+
+    def refresh(self, token):
+        return self.client.post(self.url, {"refresh_token": token}, content_type="application/json")
+
+    def test_rotate_then_replay_revokes_family(self):
+        response = self.refresh(self.refresh_token)
+        self.assertEqual(response.status_code, 200)
+        rotated = response.json()
+        self.assertEqual(JWTHandler.decode_token(rotated["refresh_token"])["gen"], 1)
+        self.assertEqual(self.client.get("/api/users/auth/me/", **bearer(rotated["access_token"])).status_code, 200)
+
+        # Replaying the generation-0 token revokes the family...
+        self.assertEqual(self.refresh(self.refresh_token).status_code, 401)
+        self.assertEqual(UserModel.get_refresh_families_revoked_since(
+            datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(minutes=1)
+        )[0][0], self.family_id)
+
+        # ...so the current refresh token and the family's access tokens are refused too
+        self.assertEqual(self.refresh(rotated["refresh_token"]).status_code, 401)
+        self.assertEqual(self.client.get("/api/users/auth/me/", **bearer(rotated["access_token"])).status_code, 401)
+
+    def test_revoked_family_refused_by_another_process(self):
+        self.refresh(self.refresh_token)
+        self.refresh(self.refresh_token)
+
+        # A process that did not see the reuse learns it on its next refresh
+        families = RevokedTokenFamilies(lifetime=REFRESH_TOKEN_LIFETIME)
+        self.assertTrue(families.is_revoked(self.family_id))
+
+
+
+class MemoryWindowStoreTests(SimpleTestCase):
+    def at(self, seconds):
+        return mock.patch("users.throttling.time.time", return_value=seconds)
+
+    def test_sliding_window_weights_previous_window(self):
+        store = MemoryWindowStore(window=60)
+        with self.at(610):
+            for _ in range(10):
+                store.add("k")
+        with self.at(690):  # Halfway through the next window
+            self.assertEqual(store.add("k", 0), 5)
+            self.assertEqual(store.add("k"), 6)
+        with self.at(800):  # Two windows later everything has expired
+            self.assertEqual(store.add("k", 0), 0)
+
+    def test_read_does_not_track_key(self):
+        store = MemoryWindowStore(window=60)
+        store.add("k", 0)
+        self.assertEqual(store.size(), 0)
+
+    def test_least_recently_used_keys_evicted(self):
+        store = MemoryWindowStore(window=60, max_keys=2)
+        with self.at(600):
+            store.add("a")
+            store.add("b")
+            store.add("a")
+            store.add("c")
+            self.assertEqual(store.size(), 2)
+            self.assertEqual(store.add("b", 0), 0)
+            self.assertEqual(store.add("a", 0), 2)
+
+    def test_previous_window_weight_decays_across_boundary(self):
+        store = MemoryWindowStore(window=60)
+        with self.at(659):
+            for _ in range(8):
+                store.add("k")
+        with self.at(660):  # Window boundary: the previous window still counts in full
+            self.assertEqual(store.add("k", 0), 8)
+        with self.at(675):
+            self.assertEqual(store.add("k", 0), 6)
+            self.assertEqual(store.add("k", 2), 8)
+        with self.at(719):
+            self.assertAlmostEqual(store.add("k", 0), 2 + 8 / 60)
+        with self.at(720):  # The old hits are now two windows back
+            self.assertEqual(store.add("k", 0), 2)
+
+    def test_reads_never_create_or_evict_keys(self):
+        store = MemoryWindowStore(window=60, max_keys=2)
+        with self.at(600):
+            store.add("a")
+            store.add("b")
+            for key in ("c", "d", "e"):
+                self.assertEqual(store.add(key, 0), 0)
+            self.assertEqual(store.size(), 2)
+            self.assertEqual(store.add("a", 0), 1)
+            self.assertEqual(store.add("b", 0), 1)
+
+    def test_distinct_keys_bounded_by_max_keys(self):
+        store = MemoryWindowStore(window=60, max_keys=100)
+        with self.at(600):
+            for i in range(1000):
+                store.add(f"ip:{i}")
+            self.assertEqual(store.size(), 100)
+            self.assertEqual(store.add("ip:899", 0), 0)
+            self.assertEqual(store.add("ip:999", 0), 1)
+
+
+class LoginThrottleTests(SimpleTestCase):
+    def setUp(self):
+        self.throttle = LoginThrottle(MemoryWindowStore(window=60), ip_limit=3, email_limit=2)
+
+    def test_every_attempt_counts_against_ip(self):
+        for _ in range(3):
+            self.assertIsNone(self.throttle.check("10.0.0.1", "a@example.com"))
+        self.assertEqual(self.throttle.check("10.0.0.1", "a@example.com"), 60)
+        self.assertIsNone(self.throttle.check("10.0.0.2", "a@example.com"))
+
+    def test_only_failures_count_against_email(self):
+        for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+            self.assertIsNone(self.throttle.check(ip, "a@example.com"))
+
+        self.throttle.record_failure("a@example.com")
+        self.throttle.record_failure("a@example.com")
+        self.assertEqual(self.throttle.check("10.0.0.4", "a@example.com"), 60)
+        self.assertIsNone(self.throttle.check("10.0.0.5", "b@example.com"))
+
+    def test_email_normalised(self):
+        self.assertEqual(LoginThrottle.email_key(" A@Example.com "), LoginThrottle.email_key("a@example.com"))
+        self.throttle.record_failure("A@Example.com")
+        self.throttle.record_failure("a@example.com ")
+        self.assertEqual(self.throttle.check("10.0.0.1", "a@EXAMPLE.com"), 60)
+
+    def test_email_not_stored_in_clear(self):
+        self.assertNotIn("example", LoginThrottle.email_key("a@example.com"))
+
+    def test_store_failure_fails_open(self):
+        store = mock.Mock(window=60)
+        store.add.side_effect = DatabaseError("down")
+        throttle = LoginThrottle(store, ip_limit=1, email_limit=1)
+        with self.assertLogs("users.throttling", "WARNING"):
+            self.assertIsNone(throttle.check("10.0.0.1", "a@example.com"))
+            throttle.record_failure("a@example.com")
+
+    def test_database_store_outage_fails_open(self):
+        throttle = LoginThrottle(PostgresWindowStore(window=60), ip_limit=1, email_limit=1)
+        with mock.patch("users.throttling.connection") as connection_:
+            connection_.cursor.side_effect = DatabaseError("connection refused")
+            with self.assertLogs("users.throttling", "WARNING") as logs:
+                for _ in range(3):
+                    self.assertIsNone(throttle.check("10.0.0.1", "a@example.com"))
+                    throttle.record_failure("a@example.com")
+        self.assertEqual(len(logs.records), 9)
+
+
+
+class TTLCacheTests(SimpleTestCase):
+    def at(self, seconds):
+        return mock.patch("users.cache.time.monotonic", return_value=seconds)
+
+    def test_entries_expire(self):
+        cache = TTLCache(max_size=10, ttl=60)
+        with self.at(100):
+            cache.set("a", 1)
+            cache.set("b", 2, ttl=5)
+        with self.at(110):
+            self.assertEqual(cache.get("a"), 1)
+            self.assertIsNone(cache.get("b"))
+        with self.at(160):
+            self.assertEqual(cache.get("a", "gone"), "gone")
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_least_recently_used_evicted(self):
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        self.assertEqual(cache.evictions, 1)
+
+    def test_invalidate_and_stats(self):
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.invalidate("a")
+        cache.get("a")
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (1, 1, 0.5))
+
+    def test_zero_size_disables_cache(self):
+        cache = TTLCache(max_size=0)
+        cache.set("a", 1)
+        self.assertIsNone(cache.get("a"))
+
+
+
+class CursorTests(SimpleTestCase):
+    def test_keyset_cursor_round_trip(self):
+        created_at = datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc)
+        cursor = encode_cursor(created_at, 42)
+        self.assertNotIn("=", cursor)
+        self.assertEqual(decode_cursor(cursor), (created_at, 42))
+
+    def test_search_cursor_round_trip(self):
+        self.assertEqual(decode_search_cursor(encode_search_cursor(0.25, 7)), (0.25, 7))
+
+    def test_malformed_cursors_rejected(self):
+        for cursor in ("", "not-base64!", encode_search_cursor(0.5, 1), "W10"):
+            with self.subTest(cursor=cursor), self.assertRaises(ValueError):
+                decode_cursor(cursor)
+        with self.assertRaises(ValueError):
+            decode_search_cursor(encode_cursor(datetime.datetime(2024, 1, 1), 1))
+
+    def test_pages_carry_next_cursor_only_when_more_rows(self):
+        created_at = datetime.datetime(2024, 1, 1)
+        rows = [{"id": i, "created_at": created_at, "distance": i / 10} for i in range(3)]
+
+        page, cursor = keyset_page(rows, 2)
+        self.assertEqual([row["id"] for row in page], [0, 1])
+        self.assertEqual(decode_cursor(cursor), (created_at, 1))
+        self.assertEqual(keyset_page(rows, 3), (rows, None))
+
+        page, cursor = search_page(rows, 2)
+        self.assertEqual(decode_search_cursor(cursor), (0.1, 1))
+        self.assertEqual(search_page(rows, 5), (rows, None))
+
+
+
+class FakeCursor:
+    def __init__(self, columns, rows):
+        self.description = [(name, None, None, None, None, None, None) for name in columns]
+        self.rows = list(rows)
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+
+class RecordTests(SimpleTestCase):
+    def test_record_reads_like_a_dict(self):
+        row = fetchone(FakeCursor(("id", "email"), [(1, "a@example.com")]))
+        self.assertEqual((row.id, row["email"], row[0]), (1, "a@example.com", 1))
+        self.assertEqual(row.get("phone", "-"), "-")
+        self.assertIn("email", row)
+        self.assertNotIn("password", row)
+        self.assertEqual(dict(**row), {"id": 1, "email": "a@example.com"})
+        with self.assertRaises(KeyError):
+            row["phone"]
+
+    def test_records_share_a_slotted_layout(self):
+        rows = fetchall(FakeCursor(("id", "email"), [(1, "a"), (2, "b")]))
+        self.assertIs(type(rows[0]), type(rows[1]))
+        self.assertIs(type(rows[0]), record_type(("id", "email")))
+        with self.assertRaises(AttributeError):
+            rows[0].__dict__
+
+    def test_empty_results(self):
+        self.assertIsNone(fetchone(FakeCursor(("id",), [])))
+        self.assertEqual(fetchall(FakeCursor(("id",), [])), [])
+
+    def test_row_factory(self):
+        self.assertIs(record_row_factory(mock.Mock(description=None)), tuple)
+        make = record_row_factory(FakeCursor(("id",), []))
+        self.assertEqual(make((5,))["id"], 5)
+
+
+
+class QueryPlanCheckTests(SimpleTestCase):
+    """
+    check_query_plans must EXPLAIN the statements the model actually runs.
+    """
+    def executed(self, method, *args, **kwargs):
+        cursor = FakeCursor(("id",), [])
+        with mock.patch("users.models.connection") as connection_:
+            connection_.cursor.return_value.__enter__.return_value = cursor
+            cursor.execute = mock.Mock()
+            method(*args, **kwargs)
+        return cursor.execute.call_args[0]
+
+    def test_checked_sql_matches_model_sql(self):
+        checked = {name: (sql, params) for name, sql, params, _ in hot_queries()}
+        self.assertEqual(self.executed(UserModel.get_login_user, "explain@example.com"), checked["get_login_user"])
+        self.assertEqual(self.executed(UserModel.get_pending_users, limit=51), checked["get_pending_users"])
+        self.assertEqual(self.executed(UserModel.search_users, "explain", limit=21), checked["search_users"])
+        self.assertEqual(self.executed(UserModel.get_artist_works_page, 1, 21, 0), checked["get_artist_works_page"])
+
+
+class ImportUploadLimitTests(TestCase):
+    url = "/api/users/admin/import-users/"
+
+    def test_count_lines(self):
+        for content, lines in [(b"", 0), (b"a\n", 1), (b"a\nb", 2), (b"a\nb\n", 2)]:
+            upload = SimpleUploadedFile("users.csv", content)
+            self.assertEqual(count_lines(upload), lines)
+            self.assertEqual(upload.read(), content)  # Rewound for the importer
+
+    @override_settings(JWT_STATELESS_AUTH=True, IMPORT_MAX_ROWS=2)
+    def test_large_upload_refused(self):
+        token, _ = JWTHandler.generate_tokens(1, {"role_type": "super_admin", "is_approved": True, "token_version": 0})
+        content = b"email\n" + b"".join(b"user%d@example.com\n" % i for i in range(3))
+        with mock.patch("users.views.imports.import_users") as import_users:
+            response = self.client.post(self.url, {"file": SimpleUploadedFile("users.csv", content)}, **bearer(token))
+
+        self.assertEqual(response.status_code, 413)
+        self.assertIn("import_users", response.json()["error"])
+        import_users.assert_not_called()
+
+
+class MetricsViewTests(SimpleTestCase):
+    @override_settings(METRICS_TOKEN=None, DEBUG=False)
+    def test_hidden_without_token(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 404)
+
+    @override_settings(METRICS_TOKEN="scrape-secret")
+    def test_token_required(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+        response = self.client.get("/metrics", **bearer("scrape-secret"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/plain; version=0.0.4; charset=utf-8")
+
+
+class ExportTests(SimpleTestCase):
+    created = datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc)
+    batches = [
+        [(1, 7, "First, work", created, created), (2, 7, 'Quote "this"', created, created)],
+        [(3, 8, "Third", created, created)],
+    ]
+
+    def export(self, fmt, compress=False):
+        with mock.patch("users.exporter.iter_batches", return_value=iter(self.batches)):
+            return b"".join(encode_chunks(export_chunks("artist_works", fmt), compress=compress))
+
+    def test_csv_export(self):
+        rows = list(csv.reader(self.export("csv").decode().splitlines()))
+        self.assertEqual(rows[0], ["id", "artist_id", "title", "created_at", "updated_at"])
+        self.assertEqual([row[:3] for row in rows[1:]], [
+            ["1", "7", "First, work"], ["2", "7", 'Quote "this"'], ["3", "8", "Third"],
+        ])
+
+    def test_ndjson_export(self):
+        rows = [json.loads(line) for line in self.export("ndjson").decode().splitlines()]
+        self.assertEqual([row["id"] for row in rows], [1, 2, 3])
+        self.assertEqual(rows[0]["title"], "First, work")
+        self.assertEqual(rows[0]["created_at"], "2024-05-01T12:30:00Z")
+
+    def test_gzip_output_matches_plain(self):
+        for fmt in ("csv", "ndjson"):
+            self.assertEqual(gzip.decompress(self.export(fmt, compress=True)), self.export(fmt))
+
+
+class DeferredWriterTests(SimpleTestCase):
+    def setUp(self):
+        self.cursor = mock.MagicMock()
+        patcher = mock.patch("users.deferred.connection")
+        connection_ = patcher.start()
+        connection_.cursor.return_value.__enter__.return_value = self.cursor
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch("users.deferred.close_old_connections")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def inserts(self):
+        return [(sql.split(" (")[0], params) for sql, params in (c[0] for c in self.cursor.execute.call_args_list)]
+
+    def wait_for(self, condition):
+        for _ in range(200):
+            if condition():
+                return
+            time.sleep(0.01)
+        self.fail("condition not reached")
+
+    def test_rows_batched_by_max_batch(self):
+        writer = DeferredWriter(max_batch=2, flush_interval=10)
+        for i in range(3):
+            writer.put("audit_events", ("n",), (i,))
+        writer.put("other", ("n",), (9,))
+        writer.drain(timeout=5)
+
+        self.assertEqual(self.inserts(), [
+            ("INSERT INTO audit_events", [0, 1]),
+            ("INSERT INTO audit_events", [2]),
+            ("INSERT INTO other", [9]),
+        ])
+        self.assertEqual(writer.written, 4)
+
+    def test_partial_batch_flushed_after_interval(self):
+        writer = DeferredWriter(max_batch=100, flush_interval=0.05)
+        writer.put("audit_events", ("n",), (1,))
+        self.wait_for(lambda: writer.written == 1)
+        self.assertEqual(self.inserts(), [("INSERT INTO audit_events", [1])])
+        writer.drain(timeout=5)
+
+    def test_rows_dropped_when_queue_full(self):
+        writing = threading.Event()
+        release = threading.Event()
+
+        def blocked_execute(sql, params):
+            writing.set()
+            release.wait(5)
+        self.cursor.execute.side_effect = blocked_execute
+
+        writer = DeferredWriter(max_batch=1, flush_interval=0, max_queue=1)
+        self.assertTrue(writer.put("audit_events", ("n",), (1,)))
+        self.assertTrue(writing.wait(5))  # The writer thread holds row 1
+        self.assertTrue(writer.put("audit_events", ("n",), (2,)))
+        self.assertFalse(writer.put("audit_events", ("n",), (3,)))
+        self.assertEqual(writer.dropped, 1)
+
+        release.set()
+        writer.drain(timeout=5)
+        self.assertEqual(writer.written, 2)
+
+    def test_drain_writes_rows_queued_before_stop(self):
+        writer = DeferredWriter(max_batch=100, flush_interval=10)
+        for i in range(5):
+            writer.put("audit_events", ("n",), (i,))
+        writer.drain(timeout=5)
+
+        self.assertFalse(writer._thread.is_alive())
+        self.assertEqual(self.inserts(), [("INSERT INTO audit_events", [0, 1, 2, 3, 4])])
+        self.assertEqual(writer.depth(), 0)
+
+
+class SparseFieldsTests(TestCase):
+    def test_parse_fields(self):
+        self.assertIsNone(parse_fields(None, PROFILE_FIELDS))
+        self.assertIsNone(parse_fields("", PROFILE_FIELDS))
+        # Declared order, duplicates and blanks dropped
+        self.assertEqual(parse_fields(" email, id,,email ", PROFILE_FIELDS), ("id", "email"))
+
+    def test_unknown_fields_rejected(self):
+        with self.assertRaises(serializers.ValidationError) as raised:
+            parse_fields("id,password,secret", PROFILE_FIELDS)
+        self.assertEqual(raised.exception.detail, {"fields": ["Unknown field(s): password, secret"]})
+
+    def test_serializer_keeps_only_requested_fields(self):
+        created_at = datetime.datetime(2024, 5, 1, tzinfo=datetime.timezone.utc)
+        row = dict(zip(PENDING_USER_FIELDS, (1, "Ada", "Lovelace", "ada@example.com", "artist", created_at)))
+        self.assertEqual(PendingUsersSerializer(row, fields=("id", "email")).data, {"id": 1, "email": "ada@example.com"})
+        self.assertEqual(set(PendingUsersSerializer(row).data), set(PENDING_USER_FIELDS))
+
+    @override_settings(JWT_STATELESS_AUTH=True)
+    def test_profile_fields(self):
+        token, _ = JWTHandler.generate_tokens(1, {"role_type": "artist", "is_approved": True, "token_version": 0})
+        with mock.patch.object(UserModel, "get_profile", return_value={"id": 1, "email": "a@example.com"}) as get_profile:
+            response = self.client.get("/api/users/auth/me/?fields=email,id", **bearer(token))
+            self.assertEqual(response.json(), {"id": 1, "email": "a@example.com"})
+            get_profile.assert_called_once_with(1, fields=("id", "email"))
+
+            response = self.client.get("/api/users/auth/me/?fields=password", **bearer(token))
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(get_profile.call_count, 1)
+
+
+@override_settings(JWT_STATELESS_AUTH=True)
+class DashboardETagTests(TestCase):
+    stats = {"total_users": 3, "approved_artists": 1, "artists": 2, "pending_artists": 1}
+
+    def get(self, url, role_type, version, **headers):
+        token, _ = JWTHandler.generate_tokens(1, {"role_type": role_type, "is_approved": True, "token_version": 0})
+        with mock.patch.object(UserModel, "get_data_version", return_value=version), \
+                mock.patch.object(UserModel, "get_user_stats", return_value=self.stats) as get_user_stats:
+            response = self.client.get(url, **bearer(token), **headers)
+        return response, get_user_stats
+
+    def test_super_admin_dashboard_not_modified(self):
+        url = "/api/users/dashboard/super-admin/"
+        response, _ = self.get(url, "super_admin", 7)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], '"super-admin-dashboard-7"')
+        self.assertIn("no-cache", response["Cache-Control"])
+        self.assertEqual(response.json()["total_users"], 3)
+
+        response, get_user_stats = self.get(url, "super_admin", 7, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], '"super-admin-dashboard-7"')
+        self.assertEqual(response.content, b"")
+        get_user_stats.assert_not_called()
+
+    def test_artist_manager_dashboard_etag_follows_data_version(self):
+        url = "/api/users/dashboard/artist-manager/"
+        response, _ = self.get(url, "artist_manager", 7)
+        etag = response["ETag"]
+        self.assertEqual(self.get(url, "artist_manager", 7, HTTP_IF_NONE_MATCH=etag)[0].status_code, 304)
+
+        # A signup or approval bumps the version: the old ETag no longer matches
+        response, get_user_stats = self.get(url, "artist_manager", 8, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], '"artist-manager-dashboard-8"')
+        self.assertEqual(response.json()["pending_approvals"], 1)
+        get_user_stats.assert_called_once_with(8)
@@ -0,0 +1,188 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryWindowStore:
+    """
+    Sliding-window counters kept in process memory. Each key holds only the
+    counts of the current and previous fixed windows; the oldest keys are
+    evicted once `max_keys` is reached, so memory stays bounded under a
+    flood of distinct IPs or emails.
+    """
+    uses_database = False
+
+    def __init__(self, window, max_keys=100000):
+        self.window = window
+        self.max_keys = max_keys
+        self._counts = OrderedDict()  # key -> [window_index, current, previous]
+        self._lock = threading.Lock()
+
+    def add(self, key, amount=1):
+        """
+        Adds `amount` hits to `key` (0 to only read) and returns the sliding
+        window estimate: the current window's count plus the previous one's,
+        weighted by how much of it still overlaps the window.
+        """
+        now = time.time()
+        index, offset = divmod(now, self.window)
+        with self._lock:
+            entry = self._counts.get(key)
+            if entry is None or entry[0] < index - 1:
+                entry = [index, 0, 0]
+            elif entry[0] == index - 1:
+                entry = [index, 0, entry[1]]
+            entry[1] += amount
+            if amount or key in self._counts:
+                self._counts[key] = entry
+                self._counts.move_to_end(key)
+                while len(self._counts) > self.max_keys:
+                    self._counts.popitem(last=False)
+        return entry[1] + entry[2] * (1 - offset / self.window)
+
+    def size(self):
+        return len(self._counts)
+
+
+class PostgresWindowStore:
+    """
+    Sliding-window counters shared by every worker through the UNLOGGED
+    login_throttle table (one row per key and fixed window).
+    """
+    CLEANUP_EVERY = 1000  # calls between deletions of expired windows
+    uses_database = True
+
+    def __init__(self, window):
+        self.window = window
+        self._calls = 0
+
+    def add(self, key, amount=1):
+        now = time.time()
+        index, offset = divmod(now, self.window)
+        index = int(index)
+        with connection.cursor() as cursor:
+            if amount:
+                cursor.execute("""
+                    WITH bumped AS (
+                        INSERT INTO login_throttle (key, window_index, count) VALUES (%s, %s, %s)
+                        ON CONFLICT (key, window_index) DO UPDATE SET count = login_throttle.count + EXCLUDED.count
+                        RETURNING count
+                    )
+                    SELECT (SELECT count FROM bumped),
+                           COALESCE((SELECT count FROM login_throttle WHERE key = %s AND window_index = %s), 0);
+                """, [key, index, amount, key, index - 1])
+            else:
+                cursor.execute("""
+                    SELECT COALESCE(SUM(count) FILTER (WHERE window_index = %s), 0),
+                           COALESCE(SUM(count) FILTER (WHERE window_index = %s), 0)
+                    FROM login_throttle WHERE key = %s AND window_index >= %s;
+                """, [index, index - 1, key, index - 1])
+            current, previous = cursor.fetchone()
+
+            self._calls += 1
+            if self._calls % self.CLEANUP_EVERY == 0:
+                cursor.execute("DELETE FROM login_throttle WHERE window_index < %s;", [index - 1])
+        return current + previous * (1 - offset / self.window)
+
+    def size(self):
+        return None
+
+
+class LoginThrottle:
+    """
+    Limits login attempts per client IP and per email before the password
+    is hashed. Every attempt counts against the IP, which caps the hashing
+    CPU one client can burn. Only failed attempts count against the email,
+    which stops guessing one account's password from many IPs.
+    """
+    def __init__(self, store, ip_limit, email_limit):
+        self.store = store
+        self.ip_limit = ip_limit
+        self.email_limit = email_limit
+
+    @staticmethod
+    def email_key(email):
+        # Hashed so emails are not kept in memory or in the table
+        return "email:" + hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+
+    def check(self, ip, email):
+        """
+        Records the attempt against the IP and returns the number of seconds
+        to wait if the attempt must be rejected, else None.
+        """
+        if self.ip_limit and ip and self._add(f"ip:{ip}") > self.ip_limit:
+            registry.inc("login_throttle_rejections_total", (("scope", "ip"),))
+            return self.retry_after()
+        if self.email_limit and email and self._add(self.email_key(email), 0) >= self.email_limit:
+            registry.inc("login_throttle_rejections_total", (("scope", "email"),))
+            return self.retry_after()
+        return None
+
+    def record_failure(self, email):
+        if self.email_limit and email:
+            self._add(self.email_key(email))
+
+    def _add(self, key, amount=1):
+        try:
+            return self.store.add(key, amount)
+        except DatabaseError:
+            # Fail open: a throttle outage must not take login down with it
+            logger.warning("Login throttle store unavailable", exc_info=True)
+            return 0
+
+    def retry_after(self):
+        return math.ceil(self.store.window)
+
+
+registry.describe("login_throttle_rejections_total", "counter", "Login attempts rejected before hashing, by scope.")
+
+_throttle = None
+_throttle_lock = threading.Lock()
+
+
+def get_login_throttle():
+    """
+    Returns the process-wide LoginThrottle configured by the LOGIN_THROTTLE_* settings.
+    """
+    global _throttle
+    if _throttle is None:
+        with _throttle_lock:
+            if _throttle is None:
+                window = getattr(settings, "LOGIN_THROTTLE_WINDOW", 60)
+                if getattr(settings, "LOGIN_THROTTLE_BACKEND", "memory") == "postgres":
+                    store = PostgresWindowStore(window)
+                else:
+                    store = MemoryWindowStore(window, getattr(settings, "LOGIN_THROTTLE_MAX_KEYS", 100000))
+                _throttle = LoginThrottle(
+                    store,
+                    ip_limit=getattr(settings, "LOGIN_THROTTLE_IP_LIMIT", 20),
+                    email_limit=getattr(settings, "LOGIN_THROTTLE_EMAIL_LIMIT", 5),
+                )
+    return _throttle
+
+
+def client_ip(request):
+    """
+    Returns the client IP from LOGIN_THROTTLE_IP_HEADER (REMOTE_ADDR by default;
+    set e.g. HTTP_X_REAL_IP behind a proxy that sets it).
+    """
+    value = request.META.get(getattr(settings, "LOGIN_THROTTLE_IP_HEADER", "REMOTE_ADDR"), "")
+    return value.split(",")[0].strip() or None
+
+
+@registry.register_collector
+def login_throttle_metrics():
+    size = _throttle.store.size() if _throttle is not None else None
+    if size is None:
+        return []
+    return [("login_throttle_keys", "gauge", "Keys tracked by the in-memory login throttle.", (), size)]
@@ -1,19 +1,37 @@
 from django.urls import path, include
 from .views.auth import SignupView, LoginView, RefreshTokenView
-from .views.approval import ApproveUserView, PendingUsersView
+from .views.approval import (
+    ApproveUserView, BulkApproveUsersView, RevokeTokensView, PendingUsersView, DatabasePoolStatsView,
+)
 from .views.dashboard import SuperAdminDashboardView, ArtistManagerDashboardView, ArtistDashboardView  # Import all the dashboard views
+from .views.works import ArtistWorksView
+from .views.imports import ImportUsersView
+from .views.exports import ExportView
+from .views.profile import ProfileView
+from .views.search import UserSearchView, WorkSearchView
+from .views.async_views import (
+    AsyncLoginView, AsyncRefreshTokenView,
+    AsyncSuperAdminDashboardView, AsyncArtistManagerDashboardView, AsyncArtistDashboardView,
+    PendingApprovalsStreamView,
+)
 
 # Authentication URLs
 auth_urlpatterns = [
     path('signup/', SignupView.as_view(), name='signup'),
     path('login/', LoginView.as_view(), name='login'),
     path('refresh-token/', RefreshTokenView.as_view(), name='refresh-token'),
+    path('me/', ProfileView.as_view(), name='profile'),
 ]
 
 # Admin URLs
 admin_urlpatterns = [
     path('approve-user/', ApproveUserView.as_view(), name='approve-user'),
+    path('bulk-approve/', BulkApproveUsersView.as_view(), name='bulk-approve'),
+    path('revoke-tokens/', RevokeTokensView.as_view(), name='revoke-tokens'),
+    path('import-users/', ImportUsersView.as_view(), name='import-users'),
+    path('export/', ExportView.as_view(), name='export'),
     path('pending-users/', PendingUsersView.as_view(), name='pending-users'),
+    path('db-pool/', DatabasePoolStatsView.as_view(), name='db-pool'),
 ]
 
 # Dashboard URLs
@@ -23,9 +41,33 @@ dashboard_urlpatterns = [
     path('artist/', ArtistDashboardView.as_view(), name='artist_dashboard'),
 ]
 
+# Artist URLs
+artist_urlpatterns = [
+    path('works/', ArtistWorksView.as_view(), name='artist_works'),
+]
+
+# Search URLs
+search_urlpatterns = [
+    path('users/', UserSearchView.as_view(), name='search-users'),
+    path('works/', WorkSearchView.as_view(), name='search-works'),
+]
+
+# Async (ASGI) variants of the auth and dashboard URLs
+async_urlpatterns = [
+    path('auth/login/', AsyncLoginView.as_view(), name='async-login'),
+    path('auth/refresh-token/', AsyncRefreshTokenView.as_view(), name='async-refresh-token'),
+    path('dashboard/super-admin/', AsyncSuperAdminDashboardView.as_view(), name='async_super_admin_dashboard'),
+    path('dashboard/artist-manager/', AsyncArtistManagerDashboardView.as_view(), name='async_artist_manager_dashboard'),
+    path('dashboard/artist/', AsyncArtistDashboardView.as_view(), name='async_artist_dashboard'),
+    path('admin/pending-approvals/stream/', PendingApprovalsStreamView.as_view(), name='pending-approvals-stream'),
+]
+
 # Combine all URL patterns
 urlpatterns = [
     path('auth/', include(auth_urlpatterns)),
     path('admin/', include(admin_urlpatterns)),
     path('dashboard/', include(dashboard_urlpatterns)),  # Fixed here: included dashboard_urlpatterns correctly
+    path('artist/', include(artist_urlpatterns)),
+    path('search/', include(search_urlpatterns)),
+    path('async/', include(async_urlpatterns)),
 ]
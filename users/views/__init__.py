@@ -1,5 +1,11 @@
 # users/views/__init__.py
 
 from .auth import SignupView, LoginView, RefreshTokenView
-from .approval import ApproveUserView, PendingUsersView
+from .approval import ApproveUserView, BulkApproveUsersView, PendingUsersView, DatabasePoolStatsView
 from .dashboard import SuperAdminDashboardView, ArtistManagerDashboardView, ArtistDashboardView
+from .works import ArtistWorksView
+from .imports import ImportUsersView
+from .exports import ExportView
+from .profile import ProfileView
+from .search import UserSearchView, WorkSearchView
+from .metrics import MetricsView
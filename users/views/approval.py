@@ -1,31 +1,38 @@
 # users/views/approval.py
 
+from django.conf import settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from users.models import UserModel
-from users.serializers import UserApprovalSerializer, PendingUsersSerializer
-from users.authentication import JWTAuthentication
+from rest_framework.exceptions import ValidationError
+from users.models import UserModel, PENDING_USER_FIELDS
+from users.serializers import (
+    TokenRevocationSerializer, UserApprovalSerializer, BulkApprovalSerializer, PendingUsersSerializer, CursorPaginationSerializer, parse_fields
+)
+from users.pagination import keyset_page
+from users.db_pool import pool_stats
+from users.conditional import data_etag, not_modified, with_etag
+from users.authentication import JWTAuthentication, revoke_tokens
 
 class ApproveUserView(APIView):
     """
-    Handles user approval by super_admin.
+    Handles user approval by the authenticated super_admin.
     """
     authentication_classes = [JWTAuthentication]
 
     def post(self, request):
-        serializer = UserApprovalSerializer(data=request.data)
+        # The authenticated user is the approver; never trust an id from the body
+        if getattr(request.user, "role_type", None) != "super_admin":
+            return Response({"error": "Only a super admin can approve users."}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = UserApprovalSerializer(data=request.data, context={"request": request})
         if serializer.is_valid():
             data = serializer.validated_data
 
-            # Check if the approver is a super_admin
-            approver = UserModel.get_user_by_id(data["approver_id"])
-            if not approver or approver["role_type"] != "super_admin":
-                return Response({"error": "Only a super admin can approve users."}, status=status.HTTP_403_FORBIDDEN)
-
             # Approve the user
             rows_updated = UserModel.approve_user(data["user_id"])
             if rows_updated:
+                UserModel.record_audit_events("user_approved", [data["user_id"]], actor_id=request.user.id)
                 return Response({"message": "User approved successfully."}, status=status.HTTP_200_OK)
 
             return Response({"error": "User not found or already approved."}, status=status.HTTP_404_NOT_FOUND)
@@ -33,6 +40,71 @@ class ApproveUserView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class BulkApproveUsersView(APIView):
+    """
+    Approves many users, or many approval requests, in a single statement.
+    The authenticated super_admin is the approver.
+    """
+    authentication_classes = [JWTAuthentication]
+
+    def post(self, request):
+        if getattr(request.user, "role_type", None) != "super_admin":
+            return Response({"error": "Only a super admin can approve users."}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = BulkApprovalSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        if "user_ids" in data:
+            results = [
+                {"user_id": user_id, "status": outcome}
+                for user_id, outcome in UserModel.bulk_approve_users(data["user_ids"])
+            ]
+            UserModel.record_audit_events("user_approved", [
+                result["user_id"] for result in results if result["status"] == "approved"
+            ], actor_id=request.user.id)
+        else:
+            results = [
+                {"approval_request_id": request_id, "user_id": user_id, "status": outcome}
+                for request_id, outcome, user_id in UserModel.bulk_approve_approval_requests(data["approval_request_ids"])
+            ]
+            for result in results:
+                if result["status"] == "approved":
+                    UserModel.record_audit_events("user_approved", [result["user_id"]], actor_id=request.user.id,
+                                                  data={"approval_request_id": result["approval_request_id"]})
+
+        return Response({
+            "approved": sum(1 for result in results if result["status"] == "approved"),
+            "approved_by": request.user.id,
+            "results": results,
+        }, status=status.HTTP_200_OK)
+
+
+class RevokeTokensView(APIView):
+    """
+    Revokes every access and refresh token of a user (e.g. a compromised account).
+    Only accessible by super_admins.
+    """
+    authentication_classes = [JWTAuthentication]
+
+    def post(self, request):
+        if getattr(request.user, "role_type", None) != "super_admin":
+            return Response({"error": "Only a super admin can revoke tokens."}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = TokenRevocationSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        user_id = serializer.validated_data["user_id"]
+        token_version = revoke_tokens(user_id)
+        if token_version is None:
+            return Response({"error": "User not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({"message": "Tokens revoked.", "user_id": user_id, "token_version": token_version},
+                        status=status.HTTP_200_OK)
+
+
 class PendingUsersView(APIView):
     """
     Retrieves a list of users pending approval.
@@ -42,10 +114,50 @@ class PendingUsersView(APIView):
 
     def get(self, request):
         # Check if the user is a super_admin
-        if request.user["role_type"] != "super_admin":
+        if getattr(request.user, "role_type", None) != "super_admin":
             return Response({"error": "Only super admins can view pending approvals."}, status=status.HTTP_403_FORBIDDEN)
 
-        # Fetch pending users
-        pending_users = UserModel.get_pending_users()
-        serializer = PendingUsersSerializer(pending_users, many=True)
-        return Response(serializer.data)
+        params = CursorPaginationSerializer(data=request.query_params)
+        if not params.is_valid():
+            return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            fields = parse_fields(request.query_params.get("fields"), PENDING_USER_FIELDS)
+        except ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+
+        page_size = params.validated_data.get("page_size", getattr(settings, "PENDING_USERS_PAGE_SIZE", 50))
+
+        # The page only changes with a signup or approval; the ETag is per URL (query included)
+        etag = data_etag("pending-users", UserModel.get_data_version())
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+        # Fetch one page of pending users, plus one row to detect the next page
+        pending_users = UserModel.get_pending_users(
+            limit=page_size + 1, after=params.validated_data.get("cursor"), fields=fields
+        )
+        pending_users, next_cursor = keyset_page(pending_users, page_size)
+        serializer = PendingUsersSerializer(pending_users, many=True, fields=fields)
+        return with_etag(Response({
+            "results": serializer.data,
+            "next_cursor": next_cursor,
+        }), etag)
+
+
+class DatabasePoolStatsView(APIView):
+    """
+    Returns connection pool metrics (checkouts, wait time, saturation).
+    Only accessible by super_admins.
+    """
+    authentication_classes = [JWTAuthentication]
+
+    def get(self, request):
+        if getattr(request.user, "role_type", None) != "super_admin":
+            return Response({"error": "Only super admins can view pool metrics."}, status=status.HTTP_403_FORBIDDEN)
+
+        stats = pool_stats()
+        if stats is None:
+            return Response({"pooling": False})
+        return Response({"pooling": True, **stats})
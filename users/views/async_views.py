@@ -0,0 +1,295 @@
+# users/views/async_views.py
+#
+# Async counterparts of the auth and dashboard views, served under ASGI.
+# They use AsyncUserModel so DB round trips do not tie up a worker.
+
+import asyncio
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from users.async_models import AsyncUserModel
+from users.authentication import AsyncJWTAuthentication, JWTHandler, token_families
+from users.hashing import HashingBusy, averify_password
+from users.serializers import UserLoginSerializer
+from users.conditional import data_etag, not_modified, with_etag
+from users.events import get_broker
+from users.throttling import get_login_throttle, client_ip
+
+logger = logging.getLogger(__name__)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncAPIView(View):
+    """
+    Base class for async JSON views: body parsing and JWT authentication.
+    """
+    authentication = AsyncJWTAuthentication()
+    required_role = None
+
+    def parse_body(self, request):
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+    async def authenticate(self, request):
+        """
+        Returns the authenticated user, or a JsonResponse describing why not.
+        """
+        try:
+            result = await self.authentication.authenticate_async(request)
+        except exceptions.AuthenticationFailed as e:
+            return self.unauthorized(e.detail)
+
+        if result is None:
+            return self.unauthorized("Authentication credentials were not provided.")
+
+        user = result[0]
+        if self.required_role and getattr(user, "role_type", None) != self.required_role:
+            return JsonResponse({"error": "User role type is missing or invalid"}, status=status.HTTP_403_FORBIDDEN)
+        return user
+
+    def unauthorized(self, detail):
+        response = JsonResponse({"detail": str(detail)}, status=status.HTTP_401_UNAUTHORIZED)
+        response["WWW-Authenticate"] = self.authentication.authenticate_header(None)
+        return response
+
+
+class AsyncLoginView(AsyncAPIView):
+    async def post(self, request):
+        """
+        Handles user login.
+        Only allows login for approved users.
+        """
+        serializer = UserLoginSerializer(data=self.parse_body(request) or {})
+        if serializer.is_valid():
+            data = serializer.validated_data
+
+            # Reject floods before spending CPU on the password hash
+            throttle = get_login_throttle()
+            retry_after = await self.throttle(throttle.check, client_ip(request), data["email"])
+            if retry_after is not None:
+                response = JsonResponse({"error": "Too many login attempts. Try again later."},
+                                        status=status.HTTP_429_TOO_MANY_REQUESTS)
+                response["Retry-After"] = str(retry_after)
+                return response
+
+            user = await AsyncUserModel.get_login_user(data["email"])
+
+            # Password hashing is CPU-bound; it runs on the hashing pool, off the event loop
+            valid = False
+            if user:
+                try:
+                    valid, new_hash = await averify_password(data["password"], user["password"])
+                except HashingBusy:
+                    response = JsonResponse({"error": "Server busy. Try again shortly."},
+                                            status=status.HTTP_503_SERVICE_UNAVAILABLE)
+                    response["Retry-After"] = str(HashingBusy.retry_after)
+                    return response
+
+            if valid:
+                if new_hash:
+                    try:
+                        await AsyncUserModel.update_password_hash(user["id"], new_hash, user["password"])
+                    except Exception:
+                        # Best effort: the upgrade is retried on the next login
+                        logger.warning("Password hash upgrade failed", exc_info=True)
+
+                if not user["is_approved"]:
+                    return JsonResponse({"error": "Your account is pending approval."}, status=status.HTTP_403_FORBIDDEN)
+
+                family_id = await AsyncUserModel.create_refresh_token_family(user["id"])
+                access_token, refresh_token = JWTHandler.generate_tokens(user["id"], user, family=(family_id, 0))
+                return JsonResponse({
+                    "message": "Login successful",
+                    "user": {
+                        "id": user["id"],
+                        "email": user["email"],
+                        "first_name": user["first_name"],
+                        "last_name": user["last_name"],
+                        "role_type": user["role_type"]
+                    },
+                    "access_token": access_token,
+                    "refresh_token": refresh_token
+                }, status=status.HTTP_200_OK)
+
+            await self.throttle(throttle.record_failure, data["email"])
+
+        return JsonResponse({"error": "Invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED)
+
+    @staticmethod
+    async def throttle(method, *args):
+        # The Postgres throttle store queries the database, which must not run on the event loop
+        if get_login_throttle().store.uses_database:
+            return await sync_to_async(method)(*args)
+        return method(*args)
+
+
+class AsyncRefreshTokenView(AsyncAPIView):
+    """
+    Handles token refresh using a valid refresh token, rotating its family
+    like RefreshTokenView.
+    """
+    async def post(self, request):
+        refresh_token = (self.parse_body(request) or {}).get("refresh_token")
+        if not refresh_token:
+            return JsonResponse({"error": "Refresh token is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        payload = JWTHandler.decode_token(refresh_token)
+        if not payload or payload.get("typ", "refresh") != "refresh" or "fam" not in payload or "gen" not in payload:
+            return JsonResponse({"error": "Invalid or expired refresh token."}, status=status.HTTP_401_UNAUTHORIZED)
+
+        # The revoked family set refreshes from the database, which must not run on the event loop
+        family_id = payload["fam"]
+        if token_families.refresh_due():
+            await sync_to_async(token_families.refresh)()
+        if token_families.is_revoked(family_id):
+            return JsonResponse({"error": "Invalid or expired refresh token."}, status=status.HTTP_401_UNAUTHORIZED)
+
+        user_id = payload.get("user_id")
+        user = await AsyncUserModel.rotate_refresh_token_family(family_id, user_id, payload["gen"], payload.get("ver", 0))
+        if user["generation"] is None:
+            if user["reused"]:
+                token_families.mark_revoked(family_id)
+                logger.warning("Refresh token reuse detected for user %s; family %s revoked", user_id, family_id)
+            return JsonResponse({"error": "Invalid or expired refresh token."}, status=status.HTTP_401_UNAUTHORIZED)
+
+        access_token, new_refresh_token = JWTHandler.generate_tokens(user_id, user, family=(family_id, user["generation"]))
+        return JsonResponse({
+            "access_token": access_token,
+            "refresh_token": new_refresh_token
+        })
+
+
+class AsyncSuperAdminDashboardView(AsyncAPIView):
+    required_role = "super_admin"
+
+    async def get(self, request):
+        """
+        Returns dashboard data for the Super Admin role.
+        """
+        user = await self.authenticate(request)
+        if isinstance(user, JsonResponse):
+            return user
+
+        version = await AsyncUserModel.get_data_version()
+        etag = data_etag("super-admin-dashboard", version)
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+        stats = await AsyncUserModel.get_user_stats(version)
+        return with_etag(JsonResponse({
+            "message": "Welcome, Super Admin!",
+            "total_users": stats["total_users"],
+            "total_approved_artists": stats["approved_artists"],
+        }), etag)
+
+
+class AsyncArtistManagerDashboardView(AsyncAPIView):
+    required_role = "artist_manager"
+
+    async def get(self, request):
+        """
+        Returns dashboard data for the Artist Manager role.
+        """
+        user = await self.authenticate(request)
+        if isinstance(user, JsonResponse):
+            return user
+
+        version = await AsyncUserModel.get_data_version()
+        etag = data_etag("artist-manager-dashboard", version)
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+        stats = await AsyncUserModel.get_user_stats(version)
+        return with_etag(JsonResponse({
+            "message": "Welcome, Artist Manager!",
+            "total_artists": stats["artists"],
+            "pending_approvals": stats["pending_artists"],
+        }), etag)
+
+
+class AsyncArtistDashboardView(AsyncAPIView):
+    required_role = "artist"
+
+    async def get(self, request):
+        """
+        Returns dashboard data for the Artist role.
+        """
+        user = await self.authenticate(request)
+        if isinstance(user, JsonResponse):
+            return user
+
+        total_works, recent_works = await AsyncUserModel.get_artist_works_summary(user.id, limit=5)
+        return JsonResponse({
+            "message": "Welcome, Artist!",
+            "total_works": total_works,
+            "recent_works": [work["title"] for work in recent_works],
+        })
+
+
+def sse(name, data, event_id=None):
+    """
+    Formats one server-sent event.
+    """
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.append(f"event: {name}")
+    lines.append(f"data: {json.dumps(data, cls=DjangoJSONEncoder)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class PendingApprovalsStreamView(AsyncAPIView):
+    """
+    Server-sent event stream of approval-queue changes for super admins,
+    replacing polling of the pending users list and dashboard.
+
+    Events: user_pending, approval_requested, users_approved, users_imported,
+    then a "stats" event with the updated dashboard counts. "resync" means
+    events were missed and the client should reload the pending list.
+    Id lists longer than events.MAX_EVENT_IDS are cut and flagged "truncated".
+    """
+    required_role = "super_admin"
+
+    async def get(self, request):
+        user = await self.authenticate(request)
+        if isinstance(user, JsonResponse):
+            return user
+
+        response = StreamingHttpResponse(self.stream(), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # Don't let nginx buffer the stream
+        return response
+
+    async def stream(self):
+        broker = get_broker()
+        subscription = broker.subscribe()
+        keepalive = getattr(settings, "SSE_KEEPALIVE_INTERVAL", 15)
+        try:
+            yield "retry: 5000\n\n"
+            yield sse("stats", await AsyncUserModel.get_user_stats())
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"  # Keeps proxies from closing an idle stream
+                    continue
+
+                # Forward everything already queued, then send the counts once
+                while event is not None:
+                    yield sse(event.name, event.data, event.id)
+                    event = subscription.get_nowait()
+                yield sse("stats", await AsyncUserModel.get_user_stats())
+        finally:
+            broker.unsubscribe(subscription)
@@ -1,23 +1,39 @@
 
 
-from django.contrib.auth.hashers import make_password, check_password
+import logging
+
+from django.db import DatabaseError
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from users.models import UserModel
 from users.serializers import UserSignupSerializer, UserLoginSerializer
-from users.authentication import JWTHandler
+from users.authentication import JWTHandler, token_families
+from users.hashing import HashingBusy, hash_password, verify_password
+from users.throttling import get_login_throttle, client_ip
+
+logger = logging.getLogger(__name__)
+
+
+def hashing_busy_response():
+    response = Response({"error": "Server busy. Try again shortly."}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    response["Retry-After"] = str(HashingBusy.retry_after)
+    return response
+
 
 class SignupView(APIView):
     def post(self, request):
         """
-        Handles user signup.
+        Handles user signup in a single INSERT round trip.
         Automatically approves artists and creates approval requests for super_admins and artist_managers.
         """
         serializer = UserSignupSerializer(data=request.data)
         if serializer.is_valid():
             data = serializer.validated_data
-            hashed_password = make_password(data["password"])
+            try:
+                hashed_password = hash_password(data["password"])
+            except HashingBusy:
+                return hashing_busy_response()
 
             # Automatically approve artists
             is_approved = data["role_type"] == "artist"
@@ -36,6 +52,11 @@ class SignupView(APIView):
                     role_type=data["role_type"],
                     is_approved=is_approved
                 )
+                if user_id is None:
+                    return Response(UserSignupSerializer.EMAIL_EXISTS_ERROR, status=status.HTTP_400_BAD_REQUEST)
+                UserModel.record_audit_events("user_signed_up", [user_id], actor_id=user_id, data={
+                    "role_type": data["role_type"], "is_approved": is_approved,
+                })
 
                 response_data = {
                     "message": "User created successfully.",
@@ -45,7 +66,12 @@ class SignupView(APIView):
 
                 # Generate tokens for auto-approved users (artists)
                 if is_approved:
-                    access_token, refresh_token = JWTHandler.generate_tokens(user_id)
+                    family_id = UserModel.create_refresh_token_family(user_id)
+                    access_token, refresh_token = JWTHandler.generate_tokens(user_id, {
+                        "role_type": data["role_type"],
+                        "is_approved": is_approved,
+                        "token_version": 0,
+                    }, family=(family_id, 0))
                     response_data["access_token"] = access_token
                     response_data["refresh_token"] = refresh_token
                 else:
@@ -68,14 +94,40 @@ class LoginView(APIView):
         serializer = UserLoginSerializer(data=request.data)
         if serializer.is_valid():
             data = serializer.validated_data
-            user = UserModel.get_user_by_email(data["email"])
 
-            if user and check_password(data["password"], user["password"]):
+            # Reject floods before spending CPU on the password hash
+            throttle = get_login_throttle()
+            retry_after = throttle.check(client_ip(request), data["email"])
+            if retry_after is not None:
+                response = Response({"error": "Too many login attempts. Try again later."},
+                                    status=status.HTTP_429_TOO_MANY_REQUESTS)
+                response["Retry-After"] = str(retry_after)
+                return response
+
+            user = UserModel.get_login_user(data["email"])
+
+            valid = False
+            if user:
+                try:
+                    valid, new_hash = verify_password(data["password"], user["password"])
+                except HashingBusy:
+                    return hashing_busy_response()
+
+            if valid:
+                if new_hash:
+                    # Stored with an outdated hasher or cost; upgrade it now we know the password
+                    try:
+                        UserModel.update_password_hash(user["id"], new_hash, user["password"])
+                    except DatabaseError:
+                        # Best effort: the upgrade is retried on the next login
+                        logger.warning("Password hash upgrade failed", exc_info=True)
+
                 if not user["is_approved"]:
                     return Response({"error": "Your account is pending approval."}, status=status.HTTP_403_FORBIDDEN)
 
-                # Generate tokens for approved users
-                access_token, refresh_token = JWTHandler.generate_tokens(user["id"])
+                # Generate tokens for approved users, starting a new refresh token family
+                family_id = UserModel.create_refresh_token_family(user["id"])
+                access_token, refresh_token = JWTHandler.generate_tokens(user["id"], user, family=(family_id, 0))
                 return Response({
                     "message": "Login successful",
                     "user": {
@@ -89,31 +141,43 @@ class LoginView(APIView):
                     "refresh_token": refresh_token
                 }, status=status.HTTP_200_OK)
 
+            throttle.record_failure(data["email"])
+
         return Response({"error": "Invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED)
 
 
 class RefreshTokenView(APIView):
     """
     Handles token refresh using a valid refresh token.
+    Each refresh rotates the token's family; replaying an already rotated
+    refresh token revokes the whole family.
     """
     def post(self, request):
         refresh_token = request.data.get("refresh_token")
         if not refresh_token:
             return Response({"error": "Refresh token is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Decode the refresh token
+        # Decode the refresh token; tokens issued before families existed carry no "fam"
         payload = JWTHandler.decode_token(refresh_token)
-        if not payload:
+        if not payload or payload.get("typ", "refresh") != "refresh" or "fam" not in payload or "gen" not in payload:
             return Response({"error": "Invalid or expired refresh token."}, status=status.HTTP_401_UNAUTHORIZED)
 
-        # Fetch the user
+        # Revoked families are refused from memory, without a query
+        family_id = payload["fam"]
+        if token_families.is_revoked(family_id):
+            return Response({"error": "Invalid or expired refresh token."}, status=status.HTTP_401_UNAUTHORIZED)
+
+        # Rotate the family and load the user's auth columns in one statement
         user_id = payload.get("user_id")
-        user = UserModel.get_user_by_id(user_id)
-        if not user or not user["is_approved"]:
-            return Response({"error": "User not found or not approved."}, status=status.HTTP_401_UNAUTHORIZED)
+        user = UserModel.rotate_refresh_token_family(family_id, user_id, payload["gen"], payload.get("ver", 0))
+        if user["generation"] is None:
+            if user["reused"]:
+                token_families.mark_revoked(family_id)
+                logger.warning("Refresh token reuse detected for user %s; family %s revoked", user_id, family_id)
+            return Response({"error": "Invalid or expired refresh token."}, status=status.HTTP_401_UNAUTHORIZED)
 
         # Generate new tokens
-        access_token, new_refresh_token = JWTHandler.generate_tokens(user_id)
+        access_token, new_refresh_token = JWTHandler.generate_tokens(user_id, user, family=(family_id, user["generation"]))
         return Response({
             "access_token": access_token,
             "refresh_token": new_refresh_token
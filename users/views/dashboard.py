@@ -4,6 +4,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import AuthenticationFailed
 from users.authentication import JWTAuthentication
 from users.models import UserModel
+from users.conditional import data_etag, not_modified, with_etag
 
 class SuperAdminDashboardView(APIView):
     authentication_classes = [JWTAuthentication]
@@ -19,27 +20,29 @@ class SuperAdminDashboardView(APIView):
         if not user:
             raise AuthenticationFailed('User not authenticated or token invalid')
         
-        # Debug information
-        print(f"User attributes: {vars(user)}")
-        
         role_type = getattr(user, 'role_type', None)
-        print(f"Role type: {role_type}")
         
         # Check for 'super_admin' (with underscore) not 'super-admin' (with hyphen)
         if not role_type or role_type != 'super_admin':
             raise AttributeError('User role type is missing or invalid')
 
-        # Use raw SQL methods
-        total_users = UserModel.get_total_users_count()
-        total_approved_artists = UserModel.get_approved_artists_count()
+        # Answer unchanged polls with a 304 after one tiny version read
+        version = UserModel.get_data_version()
+        etag = data_etag("super-admin-dashboard", version)
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+        # Single-scan, cached counts for all roles
+        stats = UserModel.get_user_stats(version)
         
         data = {
             "message": "Welcome, Super Admin!",
-            "total_users": total_users,
-            "total_approved_artists": total_approved_artists,
+            "total_users": stats["total_users"],
+            "total_approved_artists": stats["approved_artists"],
         }
 
-        return Response(data)
+        return with_etag(Response(data), etag)
 
 class ArtistManagerDashboardView(APIView):
     authentication_classes = [JWTAuthentication]
@@ -59,17 +62,23 @@ class ArtistManagerDashboardView(APIView):
         if not role_type or role_type != 'artist_manager':
             raise AttributeError('User role type is missing or invalid')
 
-        # Use raw SQL methods
-        total_artists = UserModel.get_artists_count()
-        pending_approvals = UserModel.get_pending_artists_count()
+        # Answer unchanged polls with a 304 after one tiny version read
+        version = UserModel.get_data_version()
+        etag = data_etag("artist-manager-dashboard", version)
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+        # Single-scan, cached counts for all roles
+        stats = UserModel.get_user_stats(version)
 
         data = {
             "message": "Welcome, Artist Manager!",
-            "total_artists": total_artists,
-            "pending_approvals": pending_approvals,
+            "total_artists": stats["artists"],
+            "pending_approvals": stats["pending_artists"],
         }
 
-        return Response(data)
+        return with_etag(Response(data), etag)
 
 
 class ArtistDashboardView(APIView):
@@ -89,13 +98,13 @@ class ArtistDashboardView(APIView):
         if not role_type or role_type != 'artist':
             raise AttributeError('User role type is missing or invalid')
 
-        # Use raw SQL for artist works
-        artist_works = UserModel.get_artist_works(user.id)
+        # Count plus the five most recent works, without loading the rest
+        total_works, recent_works = UserModel.get_artist_works_summary(user.id, limit=5)
         
         data = {
             "message": "Welcome, Artist!",
-            "total_works": len(artist_works),
-            "recent_works": [work['title'] for work in artist_works[:5]] if artist_works else [],
+            "total_works": total_works,
+            "recent_works": [work['title'] for work in recent_works],
         }
 
         return Response(data)
\ No newline at end of file
@@ -0,0 +1,44 @@
+# users/views/exports.py
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from users.authentication import JWTAuthentication
+from users.exporter import EXPORT_DATASETS, EXPORT_FORMATS, aiter_sync, encode_chunks, export_chunks
+
+CONTENT_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+class ExportView(APIView):
+    """
+    Streams a full export of users or artist works as CSV or NDJSON,
+    optionally gzipped (?gzip=1). Memory use stays flat whatever the table size.
+    Only accessible by super_admins.
+    """
+    authentication_classes = [JWTAuthentication]
+
+    def get(self, request):
+        if getattr(request.user, "role_type", None) != "super_admin":
+            return Response({"error": "Only super admins can export data."}, status=status.HTTP_403_FORBIDDEN)
+
+        dataset = request.query_params.get("dataset", "users")
+        fmt = request.query_params.get("format", "csv")
+        if dataset not in EXPORT_DATASETS:
+            return Response({"dataset": [f"Must be one of: {', '.join(EXPORT_DATASETS)}."]},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if fmt not in EXPORT_FORMATS:
+            return Response({"format": ["Must be 'csv' or 'ndjson'."]}, status=status.HTTP_400_BAD_REQUEST)
+        compress = request.query_params.get("gzip") in ("1", "true")
+
+        content = encode_chunks(export_chunks(dataset, fmt), compress=compress)
+        if isinstance(request._request, ASGIRequest):
+            content = aiter_sync(content)
+
+        filename = f"{dataset}.{fmt}" + (".gz" if compress else "")
+        response = StreamingHttpResponse(
+            content, content_type="application/gzip" if compress else CONTENT_TYPES[fmt]
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
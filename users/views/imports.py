@@ -0,0 +1,63 @@
+# users/views/imports.py
+
+import io
+
+from django.conf import settings
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.parsers import MultiPartParser
+from rest_framework import status
+from users.authentication import JWTAuthentication
+from users.importer import import_users
+
+
+def count_lines(upload):
+    """
+    Counts the lines in an upload (an upper bound on its rows) and rewinds it.
+    """
+    lines = 0
+    last = b"\n"
+    for chunk in upload.chunks():
+        if chunk:
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    upload.seek(0)
+    return lines + (last != b"\n")
+
+
+class ImportUsersView(APIView):
+    """
+    Bulk-imports users from an uploaded CSV or NDJSON file.
+    Only accessible by super_admins.
+
+    The import runs inside the request and hashes one password per row, so
+    uploads are capped at IMPORT_MAX_ROWS lines (default 200) and larger
+    files are refused with 413; import those with `manage.py import_users`.
+    """
+    authentication_classes = [JWTAuthentication]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        if getattr(request.user, "role_type", None) != "super_admin":
+            return Response({"error": "Only super admins can import users."}, status=status.HTTP_403_FORBIDDEN)
+
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"file": ["This field is required."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        fmt = request.data.get("format") or ("ndjson" if upload.name.endswith((".ndjson", ".jsonl")) else "csv")
+        if fmt not in ("csv", "ndjson"):
+            return Response({"format": ["Must be 'csv' or 'ndjson'."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        max_rows = getattr(settings, "IMPORT_MAX_ROWS", 200)
+        if count_lines(upload) > max_rows + (1 if fmt == "csv" else 0):  # CSV header line
+            return Response(
+                {"error": f"Uploads are limited to {max_rows} rows; use the import_users management command."},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        # Read the upload as a text stream without loading it into memory
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8", newline="")
+        result = import_users(stream, fmt)
+
+        return Response(result, status=status.HTTP_200_OK)
@@ -0,0 +1,28 @@
+# users/views/metrics.py
+
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views import View
+from users.metrics import registry
+
+
+class MetricsView(View):
+    """
+    Serves the process-local metrics in the Prometheus text format.
+    Scrapers must send METRICS_TOKEN as a Bearer token; without a token
+    configured the endpoint answers 404 unless DEBUG is on.
+    """
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def get(self, request):
+        token = getattr(settings, "METRICS_TOKEN", None)
+        if token:
+            supplied = request.META.get("HTTP_AUTHORIZATION", "").removeprefix("Bearer ")
+            if not hmac.compare_digest(supplied.encode(), token.encode()):
+                return HttpResponse("Unauthorized\n", status=401, content_type="text/plain")
+        elif not settings.DEBUG:
+            raise Http404()
+
+        return HttpResponse(registry.render(), content_type=self.content_type)
@@ -0,0 +1,31 @@
+# users/views/profile.py
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from rest_framework import status
+from users.authentication import JWTAuthentication
+from users.models import UserModel, PROFILE_FIELDS
+from users.serializers import UserProfileSerializer, parse_fields
+
+
+class ProfileView(APIView):
+    """
+    Returns the authenticated user's profile.
+    `?fields=a,b` narrows both the selected columns and the response.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            fields = parse_fields(request.query_params.get("fields"), PROFILE_FIELDS)
+        except ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+
+        profile = UserModel.get_profile(request.user.id, fields=fields)
+        if profile is None:
+            return Response({"error": "User not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response(UserProfileSerializer(profile, fields=fields).data)
@@ -0,0 +1,73 @@
+# users/views/search.py
+
+from django.conf import settings
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from users.authentication import JWTAuthentication
+from users.models import UserModel
+from users.pagination import search_page
+from users.serializers import (
+    UserSearchSerializer, WorkSearchSerializer, UserSearchResultSerializer, WorkSearchResultSerializer
+)
+
+
+class UserSearchView(APIView):
+    """
+    Fuzzy search over user names and emails (?q=), best match first,
+    with ?role= filters and cursor pagination.
+    Super admins search every user; artist managers only artists.
+    """
+    authentication_classes = [JWTAuthentication]
+
+    def get(self, request):
+        role_type = getattr(request.user, "role_type", None)
+        if role_type not in ("super_admin", "artist_manager"):
+            return Response({"error": "Only super admins and artist managers can search users."},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        params = UserSearchSerializer(data=request.query_params)
+        if not params.is_valid():
+            return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = params.validated_data
+        roles = data.get("role")
+        if role_type == "artist_manager":
+            roles = ["artist"]
+
+        page_size = data.get("page_size", getattr(settings, "SEARCH_PAGE_SIZE", 20))
+        users = UserModel.search_users(data["q"], roles=roles, limit=page_size + 1, after=data.get("cursor"))
+        users, next_cursor = search_page(users, page_size)
+        return Response({
+            "results": UserSearchResultSerializer(users, many=True).data,
+            "next_cursor": next_cursor,
+        })
+
+
+class WorkSearchView(APIView):
+    """
+    Fuzzy search over artist work titles (?q=), best match first, with
+    cursor pagination. Artists search their own works; super admins and
+    artist managers search all works, optionally narrowed by ?artist_id=.
+    """
+    authentication_classes = [JWTAuthentication]
+
+    def get(self, request):
+        role_type = getattr(request.user, "role_type", None)
+        if role_type not in ("super_admin", "artist_manager", "artist"):
+            return Response({"error": "User role type is missing or invalid"}, status=status.HTTP_403_FORBIDDEN)
+
+        params = WorkSearchSerializer(data=request.query_params)
+        if not params.is_valid():
+            return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = params.validated_data
+        artist_id = request.user.id if role_type == "artist" else data.get("artist_id")
+
+        page_size = data.get("page_size", getattr(settings, "SEARCH_PAGE_SIZE", 20))
+        works = UserModel.search_artist_works(data["q"], artist_id=artist_id, limit=page_size + 1, after=data.get("cursor"))
+        works, next_cursor = search_page(works, page_size)
+        return Response({
+            "results": WorkSearchResultSerializer(works, many=True).data,
+            "next_cursor": next_cursor,
+        })
@@ -0,0 +1,41 @@
+# users/views/works.py
+
+from django.conf import settings
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework import status
+from users.authentication import JWTAuthentication
+from users.models import UserModel
+from users.serializers import ArtistWorkSerializer, PaginationSerializer
+
+
+class ArtistWorksView(APIView):
+    """
+    Returns the authenticated artist's works, newest first, one page at a time.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        role_type = getattr(request.user, 'role_type', None)
+        if role_type != 'artist':
+            return Response({"error": "Only artists can list their works."}, status=status.HTTP_403_FORBIDDEN)
+
+        params = PaginationSerializer(data=request.query_params)
+        if not params.is_valid():
+            return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        page = params.validated_data["page"]
+        page_size = params.validated_data.get("page_size", getattr(settings, "ARTIST_WORKS_PAGE_SIZE", 20))
+
+        # Fetch one extra row to know whether another page exists
+        works = UserModel.get_artist_works_page(request.user.id, limit=page_size + 1, offset=(page - 1) * page_size)
+        has_next = len(works) > page_size
+
+        return Response({
+            "page": page,
+            "page_size": page_size,
+            "next_page": page + 1 if has_next else None,
+            "results": ArtistWorkSerializer(works[:page_size], many=True).data,
+        })